@@ -1,8 +1,9 @@
 from datetime import timedelta
-import json
 from django.utils import timezone
 from django.utils.html import format_html
 from django.contrib import admin
+from django.db import connections, router
+from django.forms.models import BaseInlineFormSet
 from django.urls import reverse
 from django.shortcuts import redirect
 from django.contrib.auth import get_user_model
@@ -21,12 +22,13 @@ class CustomerAdminInline(admin.StackedInline):
     readonly_fields = ("state", "subscription_link")
 
     def subscription_link(self, obj):
-        if obj.subscription:
+        subscription = obj.subscription
+        if subscription:
             path = reverse(
                 f"admin:billing_stripesubscription_change",
-                args=(obj.subscription.id,),
+                args=(subscription.id,),
             )
-            return format_html("<a href={}>{}</a>", path, obj.subscription)
+            return format_html("<a href={}>{}</a>", path, subscription)
 
 
 @admin.register(models.Limit)
@@ -57,59 +59,117 @@ class StripeEventAdmin(admin.ModelAdmin):
         "status",
     ]
     list_filter = ["payload_type", "status"]
-    search_fields = ["user__email", "payload_type", "type"]
+    search_fields = ["user__email", "payload_type"]
     ordering = ["-received_at"]
     actions = ["replay_event"]
+    # How many replayed events are inserted and processed together.
+    replay_batch_size = 1000
     readonly_fields = ["received_at"]
+    raw_id_fields = ["user"]
+
+    def get_queryset(self, request):
+        """The payload body and headers can be large and aren't needed for listing events."""
+        return super().get_queryset(request).defer("body", "headers")
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search a Stripe event id on its own, so the lookup can use the event_id index
+        rather than being OR'd with the icontains searches on the other fields."""
+        search_term = search_term.strip()
+        if search_term.startswith("evt_") and " " not in search_term:
+            return queryset.filter(event_id=search_term), False
+        return super().get_search_results(request, queryset, search_term)
 
     @admin.display(description="User")
     def user_link(self, obj):
-        if obj.user:
+        if obj.user_id:
             path = reverse(
                 f"admin:{User._meta.app_label}_{User._meta.model_name}_change",
-                args=(obj.user.id,),
+                args=(obj.user_id,),
             )
             return format_html("<a href={}>{}</a>", path, obj.user)
 
-    def subscription_status(self, obj):
-        if obj.payload_type.startswith("customer.subscription."):
-            payload = json.loads(obj.body)
-            return payload["data"]["object"]["status"]
-
     @admin.action(description="Replay event")
     def replay_event(self, request, queryset):
-
-        for obj in queryset.all():
-            payload = json.loads(obj.body)
-            event = models.StripeEvent.objects.create(
-                event_id=obj.event_id,
-                payload_type=payload["type"],
-                headers=obj.headers,
-                body=obj.body,
-                created=obj.created,
-                status=models.StripeEvent.Status.NEW,
-                note=f"Replay of event pk {obj.id}",
-            )
-            if hasattr(tasks, "shared_task"):
-                tasks.process_stripe_event.apply(
-                    kwargs={
-                        "event_id": event.id,
-                        "verify_signature": False,
-                        "check_created": False,
-                    }
-                )
+        to_create = []
+        use_celery = hasattr(tasks, "shared_task")
+        if use_celery:
+            from celery import group
+
+        def _flush():
+            db = router.db_for_write(models.StripeEvent)
+            if connections[db].features.can_return_rows_from_bulk_insert:
+                # Insert the pending replays in one go rather than one INSERT per event.
+                created = models.StripeEvent.objects.bulk_create(to_create)
             else:
-                tasks.process_stripe_event(
-                    event.id, verify_signature=False, check_created=False
+                # Without the new pks from a bulk insert, the replays couldn't be processed.
+                for event in to_create:
+                    event.save()
+                created = list(to_create)
+            if use_celery:
+                group(
+                    tasks.process_stripe_event.s(
+                        event_id=event.id, verify_signature=False, check_created=False
+                    )
+                    for event in created
+                ).apply()
+            else:
+                for event in created:
+                    tasks.process_stripe_event(
+                        event.id, verify_signature=False, check_created=False
+                    )
+            to_create.clear()
+
+        replayed = []
+        # Stream the selected events so a large selection isn't loaded into memory at once.
+        events = queryset.select_related(None).only(
+            "id",
+            "event_id",
+            "payload_type",
+            "body",
+            "headers",
+            "created",
+            "subscription_status",
+        )
+        for obj in events.iterator(chunk_size=500):
+            to_create.append(
+                models.StripeEvent(
+                    event_id=obj.event_id,
+                    payload_type=obj.payload_type,
+                    headers=obj.headers,
+                    body=obj.body,
+                    created=obj.created,
+                    subscription_status=obj.subscription_status,
+                    status=models.StripeEvent.Status.NEW,
+                    note=f"Replay of event pk {obj.id}",
                 )
+            )
+            replayed.append(obj.id)
+            if len(to_create) >= self.replay_batch_size:
+                _flush()
+        if to_create:
+            _flush()
 
-            self.message_user(request, f"Event  {obj.id} replayed successfully.")
+        for pk in replayed:
+            self.message_user(request, f"Event  {pk} replayed successfully.")
 
         return redirect("admin:billing_stripeevent_changelist")
 
 
+class RecentStripeEventFormSet(BaseInlineFormSet):
+    """Only show the most recent events. This has to be done in the formset since the
+    inline's queryset is filtered down to the parent object after get_queryset()."""
+
+    max_events = 100
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            self._queryset = super().get_queryset()[: self.max_events]
+        return self._queryset
+
+
 class StripeEventAdminInline(admin.TabularInline):
     model = models.StripeEvent
+    formset = RecentStripeEventFormSet
     fields = ("__str__", "received_at", "event_id", "status")
     readonly_fields = ("__str__", "received_at", "event_id", "status")
     can_delete = False
@@ -118,7 +178,7 @@ class StripeEventAdminInline(admin.TabularInline):
 
     def get_queryset(self, request):
         """Limit rows to past 180 days."""
-        qs = super().get_queryset(request)
+        qs = super().get_queryset(request).defer("body", "headers")
         return qs.filter(received_at__gte=timezone.now() - timedelta(days=180))
 
     def has_add_permission(self, request, obj=None):
@@ -128,6 +188,7 @@ class StripeEventAdminInline(admin.TabularInline):
 @admin.register(models.StripeSubscription)
 class StripeSubscriptionAdmin(admin.ModelAdmin):
     ordering = ("-created",)
+    raw_id_fields = ("customer",)
     list_display = [
         "id",
         "customer",
@@ -2,6 +2,13 @@ from django.apps import AppConfig
 from django.core.exceptions import ImproperlyConfigured
 from . import settings
 
+REQUIRED_SETTINGS = (
+    "STRIPE_API_KEY",
+    "APPLICATION_NAME",
+    "CHECKOUT_SUCCESS_URL",
+    "CHECKOUT_CANCEL_URL",
+)
+
 
 class BillingConfig(AppConfig):
     name = "billing"
@@ -9,15 +16,10 @@ class BillingConfig(AppConfig):
     def ready(self):
         import billing.signals
 
-        for setting in (
-            "STRIPE_API_KEY",
-            "APPLICATION_NAME",
-            "CHECKOUT_SUCCESS_URL",
-            "CHECKOUT_CANCEL_URL",
-        ):
-            missing = []
-            if getattr(settings, setting) is None:
-                missing.append(setting)
-            if len(missing) > 0:
-                missing = ", ".join(missing)
-                raise ImproperlyConfigured(f"{missing} must be configured.")
+        missing = [
+            setting
+            for setting in REQUIRED_SETTINGS
+            if getattr(settings, setting) is None
+        ]
+        if missing:
+            raise ImproperlyConfigured(f"{', '.join(missing)} must be configured.")
@@ -9,7 +9,9 @@ from . import models
 factory.random.reseed_random(42)
 
 User = get_user_model()
-fake = faker.Faker()  # This is to use faker without the factory_boy wrapper
+# Use faker directly rather than through factory.Faker, which resolves the locale and
+# provider on every call.
+fake = faker.Faker()
 
 
 class LimitFactory(factory.django.DjangoModelFactory):
@@ -17,8 +19,8 @@ class LimitFactory(factory.django.DjangoModelFactory):
         model = models.Limit
         django_get_or_create = ("name",)
 
-    name = factory.Faker("numerify", text="Limit ####")
-    default = factory.Faker("pyint", max_value=100)
+    name = factory.LazyFunction(lambda: fake.numerify(text="Limit ####"))
+    default = factory.LazyFunction(lambda: fake.pyint(max_value=100))
 
 
 class PlanFactory(factory.django.DjangoModelFactory):
@@ -30,14 +32,16 @@ class PlanFactory(factory.django.DjangoModelFactory):
         # of each type if we use this factory.
         django_get_or_create = ("type",)
 
-    name = factory.Faker("numerify", text="Plan ###")
+    name = factory.LazyFunction(lambda: fake.numerify(text="Plan ###"))
     display_price = 0
     type = models.Plan.Type.FREE_DEFAULT
 
     class Params:
         paid = factory.Trait(
             type=models.Plan.Type.PAID_PUBLIC,
-            display_price=factory.Faker("pyint", min_value=1, max_value=100),
+            display_price=factory.LazyFunction(
+                lambda: fake.pyint(min_value=1, max_value=100)
+            ),
             price_id=f"price_{fake.pystr()}",
         )
 
@@ -48,18 +52,23 @@ class PlanLimitFactory(factory.django.DjangoModelFactory):
 
     plan = factory.SubFactory(PlanFactory)
     limit = factory.SubFactory(LimitFactory)
-    value = factory.Faker("pyint", max_value=100)
+    value = factory.LazyFunction(lambda: fake.pyint(max_value=100))
 
 
 class StripeSubscriptionFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = models.StripeSubscription
 
-    id = factory.Faker("pystr")
+    id = factory.LazyFunction(fake.pystr)
     customer = None  # This needs to be set.
-    current_period_end = factory.Faker(
-        "date_time_this_month", before_now=False, after_now=True, tzinfo=timezone.utc
+    current_period_end = factory.LazyFunction(
+        lambda: fake.date_time_this_month(
+            before_now=False, after_now=True, tzinfo=timezone.utc
+        )
     )
+    # Don't cache this across calls. The paid price_id never changes, but calling the
+    # PlanFactory is what guarantees the paid Plan exists in the current (possibly
+    # rolled back) database. Pass price_id explicitly to skip the lookup.
     price_id = factory.LazyFunction(lambda: PlanFactory(paid=True).price_id)
     cancel_at_period_end = False
     created = factory.LazyFunction(timezone.now)
@@ -67,6 +76,8 @@ class StripeSubscriptionFactory(factory.django.DjangoModelFactory):
 
     @factory.post_generation
     def dont_sync_to_customer(obj, create, extracted, **kwargs):
+        """Each subscription is synced to its Customer after creation, which is an extra
+        write. Pass dont_sync_to_customer=True, e.g. to create_batch, to skip it."""
         if not extracted:
             obj.sync_to_customer()
 
@@ -75,8 +86,8 @@ class UserFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = User
 
-    first_name = factory.Faker("first_name")
-    last_name = factory.Faker("last_name")
+    first_name = factory.LazyFunction(fake.first_name)
+    last_name = factory.LazyFunction(fake.last_name)
     username = factory.LazyAttribute(lambda obj: f"{obj.first_name}_{obj.last_name}")
     email = factory.LazyAttribute(
         lambda obj: f"{obj.first_name}.{obj.last_name}@example.com".lower()
@@ -111,6 +122,32 @@ class UserFactory(factory.django.DjangoModelFactory):
             setattr(obj.customer, k, v)
         obj.customer.save()
 
+    @classmethod
+    def create_batch_fast(cls, size, **kwargs):
+        """Like create_batch, but inserts the Users and their free_default Customers
+        with bulk_create. No signals are sent and the paying and customer
+        post-generation hooks don't run, so use it for plain Users only."""
+        users = User.objects.bulk_create(
+            cls.build_batch(size, **kwargs), batch_size=500
+        )
+        if users and users[0].pk is None:
+            # The database didn't return the new pks, so look the Users up by their unique username.
+            field = User.USERNAME_FIELD
+            users = list(
+                User.objects.filter(
+                    **{f"{field}__in": [getattr(user, field) for user in users]}
+                )
+            )
+        default_plan, _ = models.Plan.objects.get_or_create(
+            type=models.Plan.Type.FREE_DEFAULT,
+            defaults={"name": "Default (Free)", "display_price": 0},
+        )
+        models.Customer.objects.bulk_create(
+            [models.Customer(user=user, plan=default_plan) for user in users],
+            batch_size=500,
+        )
+        return users
+
 
 def id(prefix):
     """Return a concatenation of the prefix and a random string"""
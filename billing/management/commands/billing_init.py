@@ -1,3 +1,5 @@
+from itertools import islice
+
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from billing import models
@@ -5,16 +7,30 @@ from billing import models
 
 class Command(BaseCommand):
     help = "Initialize billing app"
+    batch_size = 1000
 
     def handle(self, *args, **options):
-        """Creates a free_default plan. Also grabs all existing Users and just saves them,
-        triggering the Customer creation signal."""
-        models.Plan.objects.get_or_create(
+        """Creates a free_default plan. Also creates a Customer for every existing User
+        that doesn't have one, which is what the Customer creation signal would do."""
+        default_plan, _ = models.Plan.objects.get_or_create(
             type=models.Plan.Type.FREE_DEFAULT,
             defaults={"name": "Default (Free)", "display_price": 0},
         )
 
         User = get_user_model()
-        for user in User.objects.all():
-            user.save()
+        user_ids = (
+            User.objects.filter(customer__isnull=True)
+            .values_list("pk", flat=True)
+            .iterator(chunk_size=self.batch_size)
+        )
+        # bulk_create() makes a list of everything it's given, so hand it one batch at a
+        # time to avoid holding a Customer for every User in memory.
+        while batch := list(islice(user_ids, self.batch_size)):
+            models.Customer.objects.bulk_create(
+                [
+                    models.Customer(user_id=user_id, plan=default_plan)
+                    for user_id in batch
+                ],
+                ignore_conflicts=True,
+            )
         print("Initialization complete.")
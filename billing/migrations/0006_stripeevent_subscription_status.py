@@ -0,0 +1,34 @@
+# Generated by Django 4.0.10 on 2026-10-16 03:45
+
+import json
+
+from django.db import migrations, models
+
+
+def backfill_subscription_status(apps, schema_editor):
+    StripeEvent = apps.get_model("billing", "StripeEvent")
+    events = StripeEvent.objects.filter(
+        payload_type__startswith="customer.subscription."
+    ).only("id", "body")
+    for event in events.iterator(chunk_size=500):
+        try:
+            status = json.loads(event.body)["data"]["object"]["status"]
+        except (ValueError, KeyError, TypeError):
+            continue
+        StripeEvent.objects.filter(pk=event.pk).update(subscription_status=status)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_stripeevent_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stripeevent',
+            name='subscription_status',
+            field=models.CharField(blank=True, help_text='The Subscription status carried by customer.subscription.* payloads.', max_length=254),
+        ),
+        migrations.RunPython(backfill_subscription_status, migrations.RunPython.noop),
+    ]
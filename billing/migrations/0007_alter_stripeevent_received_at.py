@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-16 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0006_stripeevent_subscription_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stripeevent',
+            name='received_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
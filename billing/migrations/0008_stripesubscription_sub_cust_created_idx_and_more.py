@@ -0,0 +1,21 @@
+# Generated by Django 4.0.10 on 2026-10-16 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0007_alter_stripeevent_received_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stripesubscription',
+            index=models.Index(fields=['customer', '-created'], name='sub_cust_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stripesubscription',
+            index=models.Index(condition=models.Q(('status__in', ['active', 'past_due'])), fields=['customer'], name='sub_cust_active_idx'),
+        ),
+    ]
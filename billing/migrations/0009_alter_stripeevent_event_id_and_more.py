@@ -0,0 +1,22 @@
+# Generated by Django 4.0.10 on 2026-10-16 03:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0008_stripesubscription_sub_cust_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stripeevent',
+            name='event_id',
+            field=models.CharField(db_index=True, max_length=254),
+        ),
+        migrations.AddIndex(
+            model_name='stripeevent',
+            index=models.Index(fields=['status', '-received_at'], name='event_status_received_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.0.10 on 2026-10-16 04:02
+
+from django.db import migrations, models
+
+
+def check_max_1_paid_public_plan(apps, schema_editor):
+    Plan = apps.get_model("billing", "Plan")
+    plans = list(
+        Plan.objects.filter(type="paid_public").order_by("id").values_list("id", "name")
+    )
+    if len(plans) > 1:
+        names = ", ".join(f"{name} (id={id})" for id, name in plans)
+        raise RuntimeError(
+            f"Only one paid_public Plan is allowed, but there are {len(plans)}: {names}. "
+            "Change all but one of them to paid_private or delete them, then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0009_alter_stripeevent_event_id_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_max_1_paid_public_plan, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='plan',
+            constraint=models.UniqueConstraint(condition=models.Q(('type', 'paid_public')), fields=('type',), name='max_1_paid_public_plan'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.10 on 2026-10-16 04:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0010_plan_max_1_paid_public_plan'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='stripesubscription',
+            name='sub_cust_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='stripesubscription',
+            name='sub_cust_active_idx',
+        ),
+    ]
@@ -2,6 +2,37 @@ from django.urls import reverse
 from django.utils import timezone
 from . import models
 
+STATE_NOTES = {
+    "free_default.new": "",
+    "free_default.canceled.missed_webhook": "There is an issue with your subscription. Please contact support.",
+    "paid.paying": "Subscription renews on {current_period_end}.",
+    "paid.will_cancel": "Subscription cancelled. Access available until {current_period_end}.",
+    "free_private.indefinite": "Staff plan, no expiration.",
+    "free_private.will_expire": "Staff plan expires on {current_period_end}.",
+    "free_private.expired": "Subscription expired on {current_period_end}",
+    "free_default.past_due.requires_payment_method": "There is a problem with your credit card. Please provide a new one or try again.",
+    "free_default.incomplete.requires_payment_method": "There is a problem with your credit card. Please provide a new one or try again.",
+    "paid.past_due.requires_payment_method": "There is a problem with your credit card. Please provide a new one or try again.",
+}
+DEFAULT_STATE_NOTE = "There is an issue with your subscription. Please contact support."
+
+# Maps a Customer state to the Stripe session type and button text offered to the user.
+STATE_SESSIONS = {
+    "free_default.new": ("checkout", "Upgrade to Paid Plan"),
+    "free_private.expired": ("checkout", "Upgrade to Paid Plan"),
+    "free_default.past_due.requires_payment_method": (
+        "portal",
+        "Update or Cancel Plan",
+    ),
+    "free_default.incomplete.requires_payment_method": (
+        "portal",
+        "Update or Cancel Plan",
+    ),
+    "paid.past_due.requires_payment_method": ("portal", "Update or Cancel Plan"),
+    "paid.paying": ("portal", "Update or Cancel Plan"),
+    "paid.will_cancel": ("portal", "Reactivate Paid Plan"),
+}
+
 
 class BillingMixin:
     @staticmethod
@@ -13,65 +44,37 @@ class BillingMixin:
                 customer.current_period_end
             ).strftime("%b %d, %Y")
 
-        if customer.state == "free_default.new":
-            return ""
-        elif customer.state == "free_default.canceled.missed_webhook":
-            return "There is an issue with your subscription. Please contact support."
-        elif customer.state == "paid.paying":
-            return f"Subscription renews on {current_period_end}."
-        elif customer.state == "paid.will_cancel":
-            return (
-                f"Subscription cancelled. Access available until {current_period_end}."
-            )
-        elif customer.state == "free_private.indefinite":
-            return f"Staff plan, no expiration."
-        elif customer.state == "free_private.will_expire":
-            return f"Staff plan expires on {current_period_end}."
-        elif customer.state == "free_private.expired":
-            return f"Subscription expired on {current_period_end}"
-        elif customer.state in (
-            "free_default.past_due.requires_payment_method",
-            "free_default.incomplete.requires_payment_method",
-            "paid.past_due.requires_payment_method",
-        ):
-            return "There is a problem with your credit card. Please provide a new one or try again."
-        else:
-            return "There is an issue with your subscription. Please contact support."
+        note = STATE_NOTES.get(customer.state, DEFAULT_STATE_NOTE)
+        return note.format(current_period_end=current_period_end)
 
     def get_context_data(self, **kwargs):
         ctx = {"billing_enabled": True}
         customer = self.request.user.customer
         state = customer.state
 
-        if state in (
-            "free_default.new",
-            "free_private.expired",
-        ):
-            paid_plan = models.Plan.objects.filter(
-                type=models.Plan.Type.PAID_PUBLIC
-            ).first()
-            ctx["stripe_session_url"] = reverse(
-                "billing:create_checkout_session",
-                kwargs={"slug": paid_plan.slug, "pk": paid_plan.pk},
-            )
-            # Don't use this Mixin if you have not created a PAID_PUBLIC plan.
-            if not paid_plan:
-                return {"billing_enabled": False}
-            ctx["stripe_session_button_text"] = "Upgrade to Paid Plan"
-            ctx["stripe_session_type"] = "checkout"
-        elif state in (
-            "free_default.past_due.requires_payment_method",
-            "free_default.incomplete.requires_payment_method",
-            "paid.past_due.requires_payment_method",
-            "paid.paying",
-        ):
-            ctx["stripe_session_url"] = reverse("billing:create_portal_session")
-            ctx["stripe_session_button_text"] = "Update or Cancel Plan"
-            ctx["stripe_session_type"] = "portal"
-        elif state == "paid.will_cancel":
-            ctx["stripe_session_url"] = reverse("billing:create_portal_session")
-            ctx["stripe_session_button_text"] = "Reactivate Paid Plan"
-            ctx["stripe_session_type"] = "portal"
+        session = STATE_SESSIONS.get(state)
+        if session:
+            session_type, button_text = session
+            if session_type == "checkout":
+                paid_plan = next(
+                    (
+                        plan
+                        for plan in models.cached_plans()
+                        if plan.type == models.Plan.Type.PAID_PUBLIC
+                    ),
+                    None,
+                )
+                # Don't use this Mixin if you have not created a PAID_PUBLIC plan.
+                if not paid_plan:
+                    return {"billing_enabled": False}
+                ctx["stripe_session_url"] = reverse(
+                    "billing:create_checkout_session",
+                    kwargs={"slug": paid_plan.slug, "pk": paid_plan.pk},
+                )
+            else:
+                ctx["stripe_session_url"] = reverse("billing:create_portal_session")
+            ctx["stripe_session_button_text"] = button_text
+            ctx["stripe_session_type"] = session_type
         ctx["billing_state_note"] = self.state_note(customer)
         ctx["current_plan"] = customer.plan
         return ctx
@@ -1,12 +1,22 @@
 import logging
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
-from django.db.models import CheckConstraint, Q, UniqueConstraint
+from django.db.models import (
+    Case,
+    CheckConstraint,
+    IntegerField,
+    Q,
+    UniqueConstraint,
+    When,
+)
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 
 from . import services
+from .settings import CACHE_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
@@ -56,15 +66,9 @@ class Plan(models.Model):
 
     def clean(self):
         # This is in a clean method because this is only configured via the admin.
-        if self.price_id and self.type not in (
-            Plan.Type.PAID_PUBLIC,
-            Plan.Type.PAID_PRIVATE,
-        ):
+        if self.price_id and self.type not in PAID_PLAN_TYPES:
             raise ValidationError({"type": "Plans with a price_id must be paid."})
-        if (
-            self.type in (Plan.Type.PAID_PUBLIC, Plan.Type.PAID_PRIVATE)
-            and not self.price_id
-        ):
+        if self.type in PAID_PLAN_TYPES and not self.price_id:
             raise ValidationError({"price_id": "Paid plans must have a price_id."})
         if (
             self.type == Plan.Type.FREE_DEFAULT
@@ -104,10 +108,55 @@ class Plan(models.Model):
                 fields=["type"],
                 condition=Q(type="free_default"),
                 name="max_1_free_default_plan",
-            )
+            ),
+            # Same for the single public paid plan.
+            UniqueConstraint(
+                fields=["type"],
+                condition=Q(type="paid_public"),
+                name="max_1_paid_public_plan",
+            ),
         ]
 
 
+PAID_PLAN_TYPES = frozenset((Plan.Type.PAID_PUBLIC, Plan.Type.PAID_PRIVATE))
+
+PLAN_CACHE_KEY = "billing:plans"
+
+
+def cached_plans():
+    """Plans rarely change but are looked up on nearly every request and webhook, so keep
+    a snapshot of them in the cache. Only the fields needed for lookups are loaded.
+    The cache is cleared whenever a Plan is saved or deleted. Other processes only see that
+    right away if they share the cache, e.g., Redis or Memcached. With a per-process cache like
+    the default LocMemCache, they see it once their copy expires after CACHE_TIMEOUT seconds."""
+    plans = cache.get(PLAN_CACHE_KEY)
+    if plans is None:
+        plans = list(Plan.objects.only("id", "name", "type", "price_id").order_by("id"))
+        cache.set(PLAN_CACHE_KEY, plans, CACHE_TIMEOUT)
+    return plans
+
+
+def clear_plan_cache():
+    cache.delete(PLAN_CACHE_KEY)
+
+
+def free_default_plan_id():
+    """The id of the free_default Plan, from cached_plans(). Like the rest of that cache, a
+    change made in another process is only seen right away if the cache is shared."""
+    for plan in cached_plans():
+        if plan.type == Plan.Type.FREE_DEFAULT:
+            return plan.id
+    raise Plan.DoesNotExist("There is no Default (Free) plan.")
+
+
+def plan_id_for_price(price_id):
+    for plan in cached_plans():
+        if plan.price_id == price_id:
+            return plan.id
+    # The Plan may have been created since the cache was filled in another process.
+    return Plan.objects.only("id").get(price_id=price_id).id
+
+
 class PlanLimit(models.Model):
     plan = models.ForeignKey("Plan", on_delete=models.CASCADE)
     limit = models.ForeignKey("Limit", on_delete=models.CASCADE)
@@ -122,9 +171,60 @@ class PlanLimit(models.Model):
         return self.limit.name
 
 
+LIMIT_CACHE_KEY = "billing:limits"
+
+
+def cached_limits():
+    """Like Plans, Limits and the values Plans set for them only change in the admin, so
+    keep a snapshot in the cache. Returns a dict with each Limit's default by name under
+    "defaults", and each Plan's values by Plan id and Limit name under "plans".
+    The cache is cleared whenever a Limit or PlanLimit is saved or deleted, with the same
+    caveat for per-process caches as cached_plans()."""
+    limits = cache.get(LIMIT_CACHE_KEY)
+    if limits is None:
+        limits = {
+            "defaults": dict(Limit.objects.values_list("name", "default")),
+            "plans": {},
+        }
+        for plan_id, name, value in PlanLimit.objects.values_list(
+            "plan_id", "limit__name", "value"
+        ):
+            limits["plans"].setdefault(plan_id, {})[name] = value
+        cache.set(LIMIT_CACHE_KEY, limits, CACHE_TIMEOUT)
+    return limits
+
+
+def clear_limit_cache():
+    cache.delete(LIMIT_CACHE_KEY)
+
+
+class CustomerQuerySet(models.QuerySet):
+    def with_limits(self):
+        """Load the Plan and its PlanLimits along with each Customer so get_limit
+        doesn't need to query for limits set on the Customer's Plan."""
+        return self.select_related("plan").prefetch_related(
+            models.Prefetch(
+                "plan__planlimit_set",
+                queryset=PlanLimit.objects.select_related("limit"),
+            )
+        )
+
+    def with_subscriptions(self):
+        """Load the Plan and StripeSubscriptions along with each Customer so reading
+        Customer.subscription or Customer.state doesn't need a query per Customer."""
+        return self.select_related("plan").prefetch_related("stripesubscription_set")
+
+    def with_plan_and_user(self):
+        """Load the Plan and User along with each Customer so reading customer.plan or
+        customer.user doesn't need a query per Customer."""
+        return self.select_related("plan", "user")
+
+
 class Customer(models.Model):
     """User attributes related to billing and payment"""
 
+    objects = CustomerQuerySet.as_manager()
+
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     customer_id = models.CharField(
         max_length=254,
@@ -136,6 +236,23 @@ class Customer(models.Model):
     plan = models.ForeignKey("Plan", on_delete=models.PROTECT)
     current_period_end = models.DateTimeField(null=True, blank=True)
 
+    def clear_cached_state(self):
+        """subscription and state are computed once per instance. Forget them, and any
+        prefetched StripeSubscriptions, so they're recomputed the next time they're accessed."""
+        self.__dict__.pop("subscription", None)
+        self.__dict__.pop("state", None)
+        getattr(self, "_prefetched_objects_cache", {}).pop(
+            "stripesubscription_set", None
+        )
+
+    def save(self, *args, **kwargs):
+        self.clear_cached_state()
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.clear_cached_state()
+        super().refresh_from_db(*args, **kwargs)
+
     def cancel_subscription(self, immediate):
         if not self.subscription:
             logger.error(
@@ -146,159 +263,94 @@ class Customer(models.Model):
         logger.info(
             f"User.id={self.user.id} canceling subscription_id {self.subscription.id}"
         )
-        self.save()
         return services.stripe_cancel_subscription(self.subscription.id, immediate)
 
-    @property
+    @cached_property
     def subscription(self):
         """Get the Customer's StripeSubscription, if any, dealing with the situation of
         multiple subscriptions, which can happen erroneously or after a cancelation and renewal."""
 
+        # A Customer that hasn't been saved yet, e.g. one being added in the admin, can't have any.
+        if self.pk is None:
+            return None
+
         # If the Customer isn't on a paid plan, pretend deleted subscriptions don't exist.
         # We have to check if they're on a paid plan since a deleted subscription is still
         # needed for sync_to_customer. But once the Customer is synced (and back on a free_default plan)
         # is there, it's easiest to pretend the StripeSubscription just doesn't exist anymore.
-        subscriptions = self.stripesubscription_set.order_by("-created")
-        if self.plan.type not in (Plan.Type.PAID_PUBLIC, Plan.Type.PAID_PRIVATE):
-            subscriptions = subscriptions.exclude(
-                status__in=[
-                    StripeSubscription.Status.CANCELED,
-                    StripeSubscription.Status.INCOMPLETE_EXPIRED,
-                ]
-            )
+        excluded = []
+        if self.plan.type not in PAID_PLAN_TYPES:
+            excluded = [
+                StripeSubscription.Status.CANCELED,
+                StripeSubscription.Status.INCOMPLETE_EXPIRED,
+            ]
 
         # We prefer an active subscription to a past_due subscription to every other subscription.
         # If there are still multiple subscriptions after that heuristic, we take the most recently created one.
-        for s in subscriptions:
-            if s.status == "active":
-                return s
-
-        for s in subscriptions:
-            if s.status == "past_due":
-                return s
-
-        if len(subscriptions) > 0:
-            return subscriptions[0]
+        prefetched = getattr(self, "_prefetched_objects_cache", {}).get(
+            "stripesubscription_set"
+        )
+        if prefetched is not None:
+            # Customer.objects.with_subscriptions() already loaded them.
+            return StripeSubscription.preferred(prefetched, self.plan.type)
+
+        return (
+            self.stripesubscription_set.exclude(status__in=excluded)
+            .annotate(
+                preference=Case(
+                    When(status=StripeSubscription.Status.ACTIVE, then=0),
+                    When(status=StripeSubscription.Status.PAST_DUE, then=1),
+                    default=2,
+                    output_field=IntegerField(),
+                )
+            )
+            .order_by("preference", "-created")
+            .first()
+        )
 
-    @property
+    @cached_property
     def state(self):
-        if (
-            self.plan.type == Plan.Type.FREE_DEFAULT
-            and self.current_period_end is None
-            and self.subscription is None
-        ):
-            return "free_default.new"
-
-        if (
-            self.plan.type != Plan.Type.FREE_DEFAULT
-            and self.current_period_end is not None
-            and self.current_period_end < timezone.now()
-            and self.subscription is not None
-            and self.subscription.status == StripeSubscription.Status.ACTIVE
-            and self.subscription.cancel_at_period_end is True
-        ):
-            # There's a paid or free private plan, but it's expired, and it was expected to be canceled.
-            # This will only happen if we miss the final cancelation webhook or reactivation webhook.
-            # This will present as a canceled subscription.
-            return "free_default.canceled.missed_webhook"
-
-        if (
-            self.plan.type in (Plan.Type.PAID_PUBLIC, Plan.Type.PAID_PRIVATE)
-            and self.current_period_end is not None
-            and self.current_period_end > timezone.now()
-            and self.subscription
-            and self.subscription.status == "active"
-            and self.subscription.cancel_at_period_end is False
-        ):
-            # There's a paid plan, it's not expired, the subscription is active, and we don't intend to cancel it.
-            return "paid.paying"
-
-        if (
-            self.plan.type in (Plan.Type.PAID_PUBLIC, Plan.Type.PAID_PRIVATE)
-            and self.current_period_end is not None
-            and self.current_period_end > timezone.now()
-            and self.subscription
-            and self.subscription.status == StripeSubscription.Status.ACTIVE
-            and self.subscription.cancel_at_period_end is True
-        ):
-            # There's a paid plan, it's not expired, but the subscription will be canceled at the end of the period.
-            # This Customer can be reactivated.
-            return "paid.will_cancel"
-
-        if (
-            self.plan.type == Plan.Type.FREE_PRIVATE
-            and self.current_period_end is None
-            and self.subscription is None
-        ):
-            # Free private plan with no expiration date
-            return "free_private.indefinite"
-
-        if (
-            self.plan.type == Plan.Type.FREE_PRIVATE
-            and self.current_period_end is not None
-            and self.current_period_end > timezone.now()
-            and self.subscription is None
-        ):
-            # Free private plan with an expiration date in the future.
-            # An expiration date in the past yields free_private.expired.
-            return "free_private.will_expire"
-
-        if (
-            self.plan.type == Plan.Type.FREE_PRIVATE
-            and self.current_period_end is not None
-            and self.current_period_end < timezone.now()
-            and self.subscription is None
-        ):
-            # Free private plan with an expiration date in the past.
-            return "free_private.expired"
-
-        if (
-            self.plan.type == Plan.Type.FREE_DEFAULT
-            and self.current_period_end is None
-            and self.subscription is not None
-            and self.subscription.status == StripeSubscription.Status.INCOMPLETE
-        ):
-            # There's a plan but it never got off the ground because the credit card
-            # attached but could not be used. The application will treat the plan
-            # as free_default because it was never actually started.
-            return "free_default.incomplete.requires_payment_method"
-
-        if (
-            self.plan.type in (Plan.Type.PAID_PUBLIC, Plan.Type.PAID_PRIVATE)
-            and self.current_period_end is not None
-            and self.current_period_end < timezone.now()
-            and self.subscription is not None
-            and self.subscription.status == StripeSubscription.Status.PAST_DUE
-        ):
-            # There's a plan, but payment is required. The current_period_end is set in the past, which
-            # means that Stripe is still retrying payment and its a past_due situation, but the application
-            # is going to treat the subscription as expired since current_period_end has lapsed.
-            return "free_default.past_due.requires_payment_method"
-
-        if (
-            self.plan.type in (Plan.Type.PAID_PUBLIC, Plan.Type.PAID_PRIVATE)
-            and self.current_period_end is not None
-            and self.current_period_end >= timezone.now()
-            and self.subscription is not None
-            and self.subscription.status == StripeSubscription.Status.PAST_DUE
-        ):
-            # There's a plan, but payment is required. The current_period_end is set in the future, which
-            # means that Stripe is still retrying payment, and it is a past_due situation, but the paid plan
-            # still has some time left, so the user can continue to use it until Stripe succeeds.
-            return "paid.past_due.requires_payment_method"
+        now = timezone.now()
+        cpe = self.current_period_end
+        if cpe is None:
+            period = None
+        elif cpe < now:
+            period = "past"
+        else:
+            period = "future"
+
+        subscription = self.subscription
+        if subscription is None:
+            status, cancel_at_period_end = None, None
+        elif subscription.status == StripeSubscription.Status.ACTIVE:
+            status = subscription.status
+            cancel_at_period_end = subscription.cancel_at_period_end
+        else:
+            status, cancel_at_period_end = subscription.status, None
 
-        logger.error(f"Customer.id={self.id} cannot properly calculate status.")
-        return "invalid"
+        state = CUSTOMER_STATES.get(
+            (self.plan.type, period, status, cancel_at_period_end), "invalid"
+        )
+        if state == "invalid":
+            logger.error(f"Customer.id={self.id} cannot properly calculate status.")
+        return state
 
     def clean(self):
         # Admin can't save the Customer if the state would be 'invalid'
+        self.clear_cached_state()
         if self.state == "invalid":
             raise ValidationError(
                 "This would make the Customer state invalid. Please fix and try again."
             )
 
     def get_limit(self, name):
-        plan = self.plan
+        return self.get_limits([name])[name]
+
+    def get_limits(self, names):
+        """Returns a dict of Limit name to value for the Customer's current Plan.
+        Use this rather than calling get_limit for each name when checking several limits."""
+        names = set(names)
+        plan_id = self.plan_id
 
         plan_expired = (
             self.current_period_end is not None
@@ -306,22 +358,43 @@ class Customer(models.Model):
         )
         if plan_expired:
             # If the Plan is expired, use the values from the free_default plan
-            plan = Plan.objects.get(type=Plan.Type.FREE_DEFAULT)
-        elif self.current_period_end is None and self.plan.type in (
-            Plan.Type.PAID_PUBLIC,
-            Plan.Type.PAID_PRIVATE,
-        ):
+            plan_id = free_default_plan_id()
+        elif self.current_period_end is None and self.plan.type in PAID_PLAN_TYPES:
             # If current_period_end is None, use the values from the free_default plan if the user's plan is paid.
             # I.e., paid plans with no current_period_end are incomplete and use the free_default limits
             # and free_private plans without current_period_end exist indefinitely.
-            plan = Plan.objects.get(type=Plan.Type.FREE_DEFAULT)
+            plan_id = free_default_plan_id()
+
+        # If the Customer's own Plan was loaded with Customer.objects.with_limits(),
+        # its PlanLimits are already in memory.
+        prefetched = None
+        if plan_id == self.plan_id and Customer.plan.is_cached(self):
+            prefetched = getattr(self.plan, "_prefetched_objects_cache", {}).get(
+                "planlimit_set"
+            )
 
-        limit = plan.planlimit_set.filter(limit__name=name).first()
-        if limit:
-            return limit.value
+        # Read the cache at most once; with a shared cache backend each read is a round trip.
+        cached = None
+        if prefetched is not None:
+            limits = {
+                pl.limit.name: pl.value for pl in prefetched if pl.limit.name in names
+            }
         else:
-            limit = Limit.objects.get(name=name)
-            return limit.default
+            cached = cached_limits()
+            plan_limits = cached["plans"].get(plan_id, {})
+            limits = {name: plan_limits[name] for name in names if name in plan_limits}
+
+        # Any limits the Plan hasn't set use the Limit default.
+        missing = names - limits.keys()
+        if missing and cached is None:
+            cached = cached_limits()
+        for name in missing:
+            if name in cached["defaults"]:
+                limits[name] = cached["defaults"][name]
+            else:
+                # The Limit may have been created since the cache was filled in another process.
+                limits[name] = Limit.objects.get(name=name).default
+        return limits
 
     def __str__(self):
         return f"{self.user}"
@@ -348,51 +421,215 @@ class StripeSubscription(models.Model):
 
     status = models.CharField(max_length=254, choices=Status.choices)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The Customer this StripeSubscription belongs to may have already computed its state.
+        if StripeSubscription.customer.is_cached(self) and self.customer is not None:
+            self.customer.clear_cached_state()
+
     def sync_to_customer(self):
         """Synchronizes data on the StripeSubscription instance to the Customer instance,
         if and as appropriate."""
+        if self.apply_to_customer():
+            self.customer.save(update_fields=["plan", "current_period_end"])
+
+    def apply_to_customer(self):
+        """Sets the Customer's plan and current_period_end from the StripeSubscription, if and
+        as appropriate, without saving the Customer. Returns whether the Customer was changed."""
         logger.debug(
             f"StripeSubscription.id={self.id} StripeSubscription.status={self.status} running sync_to_customer"
         )
 
         # Sync the plan and end date if the subscription is active.
         if self.status == StripeSubscription.Status.ACTIVE:
-            plan = Plan.objects.get(price_id=self.price_id)
-            self.customer.plan = plan
+            self.customer.plan_id = plan_id_for_price(self.price_id)
             self.customer.current_period_end = self.current_period_end
-            self.customer.save()
             logger.debug(
-                f"StripeSubscription.id={self.id} updated customer {self.customer} which is user {self.customer.user.pk} plan to {self.customer.plan} and current_period_end to {self.customer.current_period_end}"
+                f"StripeSubscription.id={self.id} updated customer which is user {self.customer.user_id} plan to Plan.id={self.customer.plan_id} and current_period_end to {self.customer.current_period_end}"
             )
+            return True
 
         # If the subscription is finally deleted, downgrade the customer to free_default and
-        # zero-out the current_period_end.
+        # zero-out the current_period_end. Do the same thing if its incomplete, but just for
+        # consistency's sake.
         if self.status in (
             StripeSubscription.Status.CANCELED,
             StripeSubscription.Status.INCOMPLETE_EXPIRED,
+            StripeSubscription.Status.INCOMPLETE,
         ):
-            plan = Plan.objects.get(type=Plan.Type.FREE_DEFAULT)
-            self.customer.plan = plan
+            self.customer.plan_id = free_default_plan_id()
             self.customer.current_period_end = None
-            self.customer.save()
+            return True
+
+        return False
+
+    @classmethod
+    def preferred(cls, subscriptions, plan_type):
+        """The StripeSubscription among subscriptions, all belonging to one Customer on a Plan
+        of plan_type, that Customer.subscription would pick, or None."""
+        excluded = ()
+        if plan_type not in PAID_PLAN_TYPES:
+            excluded = (cls.Status.CANCELED, cls.Status.INCOMPLETE_EXPIRED)
+        preference = {cls.Status.ACTIVE: 0, cls.Status.PAST_DUE: 1}
+        return max(
+            (s for s in subscriptions if s.status not in excluded),
+            key=lambda s: (-preference.get(s.status, 2), s.created),
+            default=None,
+        )
 
-        # Do the same thing if its incomplete, but just for consistency's sake.
-        if self.status == StripeSubscription.Status.INCOMPLETE:
-            plan = Plan.objects.get(type=Plan.Type.FREE_DEFAULT)
-            self.customer.plan = plan
-            self.customer.current_period_end = None
-            self.customer.save()
+    @classmethod
+    def bulk_sync_to_customer(cls, subscriptions):
+        """sync_to_customer for many StripeSubscriptions, e.g. when reconciling or backfilling,
+        with one bulk_update of their Customers. Load the subscriptions with
+        select_related("customer") to avoid a query each. Like the webhook, a subscription is
+        only synced if it's its Customer's preferred one (see Customer.subscription), whether
+        or not the others were passed in. Returns the number of Customers updated."""
+        subscriptions = [s for s in subscriptions if s.customer is not None]
+
+        # Every subscription of these Customers, in one query, with the passed-in
+        # instances standing in for their rows.
+        by_customer = {}
+        for subscription in cls.objects.filter(
+            customer__in={s.customer_id for s in subscriptions}
+        ).only("id", "customer_id", "status", "created"):
+            by_customer.setdefault(subscription.customer_id, {})[
+                subscription.id
+            ] = subscription
+        for subscription in subscriptions:
+            by_customer.setdefault(subscription.customer_id, {})[
+                subscription.id
+            ] = subscription
+
+        plan_types = {plan.id: plan.type for plan in cached_plans()}
+        customers = {}
+        for subscription in subscriptions:
+            customer = subscription.customer
+            if customer.pk in customers:
+                continue
+            plan_type = plan_types.get(customer.plan_id) or customer.plan.type
+            preferred = cls.preferred(by_customer[customer.pk].values(), plan_type)
+            if preferred is subscription and subscription.apply_to_customer():
+                customers[customer.pk] = customer
+
+        Customer.objects.bulk_update(
+            customers.values(), ["plan", "current_period_end"], batch_size=500
+        )
+        for customer in customers.values():
+            customer.clear_cached_state()
+        return len(customers)
 
     def __str__(self):
         return self.id
 
 
+# Customer.state is looked up in this table by
+# (Plan type, whether current_period_end is None, "past" or "future",
+#  StripeSubscription status, cancel_at_period_end if the subscription is active).
+# Any other combination is "invalid".
+CUSTOMER_STATES = {
+    (Plan.Type.FREE_DEFAULT, None, None, None): "free_default.new",
+    # There's a paid or free private plan, but it's expired, and it was expected to be canceled.
+    # This will only happen if we miss the final cancelation webhook or reactivation webhook.
+    # This will present as a canceled subscription.
+    (
+        Plan.Type.PAID_PUBLIC,
+        "past",
+        StripeSubscription.Status.ACTIVE,
+        True,
+    ): "free_default.canceled.missed_webhook",
+    (
+        Plan.Type.PAID_PRIVATE,
+        "past",
+        StripeSubscription.Status.ACTIVE,
+        True,
+    ): "free_default.canceled.missed_webhook",
+    (
+        Plan.Type.FREE_PRIVATE,
+        "past",
+        StripeSubscription.Status.ACTIVE,
+        True,
+    ): "free_default.canceled.missed_webhook",
+    # There's a paid plan, it's not expired, the subscription is active, and we don't intend to cancel it.
+    (
+        Plan.Type.PAID_PUBLIC,
+        "future",
+        StripeSubscription.Status.ACTIVE,
+        False,
+    ): "paid.paying",
+    (
+        Plan.Type.PAID_PRIVATE,
+        "future",
+        StripeSubscription.Status.ACTIVE,
+        False,
+    ): "paid.paying",
+    # There's a paid plan, it's not expired, but the subscription will be canceled at the end of the period.
+    # This Customer can be reactivated.
+    (
+        Plan.Type.PAID_PUBLIC,
+        "future",
+        StripeSubscription.Status.ACTIVE,
+        True,
+    ): "paid.will_cancel",
+    (
+        Plan.Type.PAID_PRIVATE,
+        "future",
+        StripeSubscription.Status.ACTIVE,
+        True,
+    ): "paid.will_cancel",
+    # Free private plan with no expiration date
+    (Plan.Type.FREE_PRIVATE, None, None, None): "free_private.indefinite",
+    # Free private plan with an expiration date in the future.
+    (Plan.Type.FREE_PRIVATE, "future", None, None): "free_private.will_expire",
+    # Free private plan with an expiration date in the past.
+    (Plan.Type.FREE_PRIVATE, "past", None, None): "free_private.expired",
+    # There's a plan but it never got off the ground because the credit card
+    # attached but could not be used. The application will treat the plan
+    # as free_default because it was never actually started.
+    (
+        Plan.Type.FREE_DEFAULT,
+        None,
+        StripeSubscription.Status.INCOMPLETE,
+        None,
+    ): "free_default.incomplete.requires_payment_method",
+    # There's a plan, but payment is required. The current_period_end is set in the past, which
+    # means that Stripe is still retrying payment and its a past_due situation, but the application
+    # is going to treat the subscription as expired since current_period_end has lapsed.
+    (
+        Plan.Type.PAID_PUBLIC,
+        "past",
+        StripeSubscription.Status.PAST_DUE,
+        None,
+    ): "free_default.past_due.requires_payment_method",
+    (
+        Plan.Type.PAID_PRIVATE,
+        "past",
+        StripeSubscription.Status.PAST_DUE,
+        None,
+    ): "free_default.past_due.requires_payment_method",
+    # There's a plan, but payment is required. The current_period_end is set in the future, which
+    # means that Stripe is still retrying payment, and it is a past_due situation, but the paid plan
+    # still has some time left, so the user can continue to use it until Stripe succeeds.
+    (
+        Plan.Type.PAID_PUBLIC,
+        "future",
+        StripeSubscription.Status.PAST_DUE,
+        None,
+    ): "paid.past_due.requires_payment_method",
+    (
+        Plan.Type.PAID_PRIVATE,
+        "future",
+        StripeSubscription.Status.PAST_DUE,
+        None,
+    ): "paid.past_due.requires_payment_method",
+}
+
+
 class StripeEvent(models.Model):
     """Stripe Events from webhooks"""
 
-    event_id = models.CharField(max_length=254)
+    event_id = models.CharField(max_length=254, db_index=True)
     payload_type = models.CharField(max_length=254)
-    received_at = models.DateTimeField(auto_now_add=True)
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -405,6 +642,11 @@ class StripeEvent(models.Model):
         blank=True,
         help_text="The timestamp of the creation of the Event on Stripe's side.",
     )
+    subscription_status = models.CharField(
+        max_length=254,
+        blank=True,
+        help_text="The Subscription status carried by customer.subscription.* payloads.",
+    )
     note = models.TextField(blank=True)
 
     class Status(models.TextChoices):
@@ -418,5 +660,13 @@ class StripeEvent(models.Model):
         max_length=127, choices=Status.choices, default=Status.NEW
     )
 
+    class Meta:
+        indexes = [
+            # The admin filters Events by status, most recently received first.
+            models.Index(
+                fields=["status", "-received_at"], name="event_status_received_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.event_id
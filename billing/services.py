@@ -5,27 +5,32 @@ import stripe
 from . import settings
 
 stripe.api_key = settings.STRIPE_API_KEY
+# stripe-python keeps one HTTP client per process with a keep-alive session per thread, so
+# connections are already reused. Retried requests carry an idempotency key, so a POST that
+# failed on the network is never applied twice.
+stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
 
 logger = logging.getLogger(__name__)
 
 
-def stripe_customer_sync_metadata_email(user, stripe_customer_id):
+def stripe_customer_sync_metadata_email(user, stripe_customer_id, stripe_customer=None):
     """If a Stripe customer has metadata, it should make sense.
     If there is no metadata, create it. If the metadata exists but
     appears wrong, log an error. Finally, sync the Stripe Customer's email
-    to whatever is in the Django db."""
+    to whatever is in the Django db.
+    Pass stripe_customer if it has already been retrieved to save a request to Stripe."""
     if settings.STRIPE_API_KEY == "mock":
         return
-    stripe_customer = stripe.Customer.retrieve(stripe_customer_id)
+    if stripe_customer is None:
+        stripe_customer = stripe.Customer.retrieve(stripe_customer_id)
     metadata = stripe_customer.metadata
-    customer_update = {}
+    metadata_update = {}
     user_pk = metadata.get("user_pk", None)
     application = metadata.get("application", None)
     errored = False
 
     if not application:
-        customer_update.setdefault("metadata", {})
-        customer_update["metadata"]["application"] = settings.APPLICATION_NAME
+        metadata_update["application"] = settings.APPLICATION_NAME
     elif application != settings.APPLICATION_NAME:
         logger.error(
             f"User.id={user.pk} Application name {settings.APPLICATION_NAME} does not match Stripe metadata {application}"
@@ -33,8 +38,7 @@ def stripe_customer_sync_metadata_email(user, stripe_customer_id):
         errored = True
 
     if not user_pk:
-        customer_update.setdefault("metadata", {})
-        customer_update["metadata"]["user_pk"] = user.pk
+        metadata_update["user_pk"] = user.pk
     elif str(user_pk) != str(user.pk):
         logger.error(
             f"User.id={user.pk} does not match Stripe metadata user_pk {user_pk}."
@@ -44,6 +48,9 @@ def stripe_customer_sync_metadata_email(user, stripe_customer_id):
     if errored:
         return False
 
+    customer_update = {}
+    if metadata_update:
+        customer_update["metadata"] = metadata_update
     if user.email != stripe_customer.email:
         logger.warning(
             f"User.id={user.pk} changed their email on Stripe to {stripe_customer.email}. Reverting."
@@ -114,7 +121,12 @@ def stripe_cancel_subscription(subscription_id, immediate=False):
 
 
 def stripe_check_webhook_signature(event):
+    # Only the signature needs checking. stripe.Webhook.construct_event would also parse
+    # the body into a stripe.Event, which the caller doesn't use.
     sig_header = event.headers["Stripe-Signature"].strip()
-    stripe.Webhook.construct_event(
-        event.body, sig_header, settings.STRIPE_WH_SECRET.strip()
+    stripe.WebhookSignature.verify_header(
+        event.body,
+        sig_header,
+        settings.STRIPE_WH_SECRET.strip(),
+        stripe.Webhook.DEFAULT_TOLERANCE,
     )
@@ -6,3 +6,5 @@ CHECKOUT_SUCCESS_URL = getattr(settings, "BILLING_CHECKOUT_SUCCESS_URL", None)
 CHECKOUT_CANCEL_URL = getattr(settings, "BILLING_CHECKOUT_CANCEL_URL", None)
 PORTAL_RETURN_URL = getattr(settings, "BILLING_PORTAL_RETURN_URL", None)
 STRIPE_WH_SECRET = getattr(settings, "BILLING_STRIPE_WH_SECRET", None)
+STRIPE_MAX_NETWORK_RETRIES = getattr(settings, "BILLING_STRIPE_MAX_NETWORK_RETRIES", 2)
+CACHE_TIMEOUT = getattr(settings, "BILLING_CACHE_TIMEOUT", 300)
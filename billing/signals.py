@@ -1,25 +1,38 @@
+from django.db import transaction
 from django.dispatch import receiver
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models.signals import pre_save, post_save, pre_delete
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 
 from . import models, services
 
-CANCELABLE_STATES = (
-    "paid.paying",
-    "paid.will_cancel",
-    "free_default.past_due.requires_payment_method",
-    "free_default.incomplete.requires_payment_method",
-    "paid.past_due.requires_payment_method",
+# Customer states with a Stripe subscription to cancel if the User is deactivated or deleted.
+CANCELABLE_STATES = frozenset(
+    (
+        "paid.paying",
+        "paid.will_cancel",
+        "free_default.past_due.requires_payment_method",
+        "free_default.incomplete.requires_payment_method",
+        "paid.past_due.requires_payment_method",
+    )
 )
 
+# User fields that are synced to the Stripe Customer.
+STRIPE_USER_FIELDS = frozenset(("first_name", "last_name", "email"))
+
 
 @receiver(pre_save, sender=settings.AUTH_USER_MODEL)
 def user_pre_save_signal(sender, instance, **kwargs):
     """If a User's name or email is changed, update it in Stripe."""
+    update_fields = kwargs.get("update_fields")
+    if instance._state.adding or (
+        update_fields is not None and not STRIPE_USER_FIELDS.intersection(update_fields)
+    ):
+        # E.g., logging in only saves last_login.
+        return
     if hasattr(instance, "customer") and instance.customer.customer_id:
         User = get_user_model()
-        orig = User.objects.get(pk=instance.pk)
+        orig = User.objects.only(*STRIPE_USER_FIELDS).get(pk=instance.pk)
         if (
             orig.first_name != instance.first_name
             or orig.last_name != instance.last_name
@@ -38,11 +51,17 @@ def user_post_save_signal(sender, instance, **kwargs):
     - If User.is_active is False, deactivate any active Stripe subscriptions.
     - Save the Customer anytime the User is saved."""
     if not hasattr(instance, "customer"):
-        default_plan, _ = models.Plan.objects.get_or_create(
-            type=models.Plan.Type.FREE_DEFAULT,
-            defaults={"name": "Default (Free)", "display_price": 0},
-        )
-        models.Customer.objects.create(user=instance, plan=default_plan)
+        try:
+            default_plan_id = models.free_default_plan_id()
+        except models.Plan.DoesNotExist:
+            default_plan, _ = models.Plan.objects.get_or_create(
+                type=models.Plan.Type.FREE_DEFAULT,
+                defaults={"name": "Default (Free)", "display_price": 0},
+            )
+            default_plan_id = default_plan.id
+        models.Customer.objects.create(user=instance, plan_id=default_plan_id)
+        # The new Customer has just been saved, and it has no subscription to cancel.
+        return
     if not instance.is_active and instance.customer.state in CANCELABLE_STATES:
         # Cancel Stripe subscription immediately if the user is being soft deleted.
         # Clears all Customer-related info (other than Stripe customer_id)
@@ -57,3 +76,20 @@ def user_hard_delete_signal(sender, instance, **kwargs):
         # Cancel Stripe subscription immediately if the user is being soft deleted.
         # Clears all Customer-related info (other than Stripe customer_id)
         instance.customer.cancel_subscription(immediate=True)
+
+
+@receiver([post_save, post_delete], sender=models.Plan)
+def plan_changed_signal(sender, instance, **kwargs):
+    """Plans are cached, so clear the cache anytime a Plan changes. Clear it again once the
+    change is committed, since another process may have cached the old Plans in between."""
+    models.clear_plan_cache()
+    transaction.on_commit(models.clear_plan_cache)
+
+
+@receiver([post_save, post_delete], sender=models.Limit)
+@receiver([post_save, post_delete], sender=models.PlanLimit)
+def limit_changed_signal(sender, instance, **kwargs):
+    """Limits are cached, so clear the cache anytime a Limit or PlanLimit changes, and again
+    once the change is committed, like Plans."""
+    models.clear_limit_cache()
+    transaction.on_commit(models.clear_limit_cache)
@@ -5,6 +5,7 @@ from re import T
 import traceback
 import stripe
 
+from django.db import transaction
 from django.utils import timezone
 
 from . import models, settings, services
@@ -17,7 +18,7 @@ except ImportError:
     logger = logging.getLogger(__name__)
 
 
-def link_user_to_event(event, customer_id):
+def find_customer(customer_id):
     """When an event comes in, try to match on the customer_id. If it can't, try to
     match on the email."""
 
@@ -27,140 +28,168 @@ def link_user_to_event(event, customer_id):
         stripe_customer = stripe.Customer.retrieve(customer_id)
         customer = models.Customer.objects.get(user__email=stripe_customer.email)
 
-    event.user = customer.user
-    event.save()
+    return customer
+
+
+def link_user_to_event(event, customer, customer_id):
+    """Link the Customer's User to the event, and set the Customer's customer_id if it
+    isn't already set."""
+    event.user_id = customer.user_id
+    event.save(update_fields=["user"])
 
     # Set customer_id if not already set.
     if not customer.customer_id:
         customer.customer_id = customer_id
-        customer.save()
+        customer.save(update_fields=["customer_id"])
 
-    return customer
+
+def handle_subscription_event(event, payload, check_created):
+    """Create or update the StripeSubscription in a customer.subscription.* event and sync it
+    to the Customer. Returns the StripeEvent's new status."""
+    data_object = payload["data"]["object"]
+
+    # Extract the relevant attributes from the event payload
+    id = data_object["id"]
+    customer_id = data_object["customer"]
+    current_period_end = data_object["current_period_end"]
+    price_id = data_object["items"]["data"][0]["price"]["id"]
+    cancel_at_period_end = data_object["cancel_at_period_end"]
+    created = data_object["created"]
+    status = data_object["status"]
+
+    # Find the Customer before the transaction below, since it may call out to Stripe.
+    try:
+        customer = find_customer(customer_id)
+    except models.Customer.DoesNotExist:
+        # If a user is being hard deleted so the subscription is immediately canceled,
+        # this will happen, so we need to be ok with a user not existing in that case.
+        if status == "canceled":
+            logger.warning(
+                f"StripeEvent.id={event.id} could not locate a user who may have been hard deleted."
+            )
+            return models.StripeEvent.Status.PROCESSED
+        else:
+            raise
+
+    # Commit the event's database writes together. No calls to Stripe are made in here, so
+    # the Customer row isn't locked while waiting on the network, and a failed call to Stripe
+    # doesn't roll back the sync.
+    with transaction.atomic():
+        # Lock the Customer so concurrent events for it are processed one at a time.
+        customer = models.Customer.objects.select_for_update().get(pk=customer.pk)
+
+        # Link Customer/User to Event
+        link_user_to_event(event, customer, customer_id)
+
+        # Ensure this Event is the latest one, i.e., Events haven't
+        # arrived out of order.
+        if check_created and (
+            models.StripeEvent.objects.filter(
+                user_id=customer.user_id, created__gte=event.created
+            )
+            .exclude(pk=event.id)
+            .exists()
+        ):
+            logger.warning(
+                f"StripeEvent.id={event.id} processed out of order. Ignoring."
+            )
+            return models.StripeEvent.Status.IGNORED
+
+        # Create or update StripeSubscription
+        subscription = models.StripeSubscription.objects.filter(id=id).first()
+        if not subscription:
+            logger.info(
+                f"StripeEvent.id={event.id} no StripeSubscription found, creating."
+            )
+            subscription = models.StripeSubscription(id=id)
+
+        subscription.current_period_end = dt.fromtimestamp(
+            current_period_end, tz=timezone.utc
+        )
+        subscription.price_id = price_id
+        subscription.cancel_at_period_end = cancel_at_period_end
+        subscription.created = dt.fromtimestamp(created, tz=timezone.utc)
+        subscription.status = status
+
+        # Link Customer/User to StripeSubscription
+        if not subscription.customer_id:
+            logger.info(
+                f"StripeEvent.id={event.id} no customer attached to StripeSubscription, attaching to {customer}."
+            )
+        else:
+            # Integrity check: if the StripeSubscription already has a customer, it should match
+            # the incoming subscription update.
+            assert (
+                subscription.customer_id == customer.pk
+            ), "Integrity error: StripeSubscription Customer does not match incoming subscription update customer_id"
+        # Share the Customer instance so syncing below updates it in place.
+        subscription.customer = customer
+        subscription.save()
+
+        # Sync the Customer with the StripeSubscription.
+
+        # If a Customer somehow erroneously has multiple StripeSubscriptions,
+        # prefer the active one, followed by past_due. If there are still multiple,
+        # take the latest created one. That's what this equality check does because
+        # of how customer.subscription the property is defined.
+        logger.debug(
+            f"StripeEvent.id={event.id} comparing subscription.id={subscription} and customer.subscription.id={customer.subscription}"
+        )
+        synced = subscription == customer.subscription
+        if synced:
+            logger.debug(
+                f"StripeEvent.id={event.id} syncing the subcription to customer"
+            )
+            subscription.sync_to_customer()
+
+    # If payment method has changed and the subscription is paid_due, retry payment.
+    pm_change = (
+        payload["data"].get("previous_attributes", {}).get("default_payment_method")
+    )
+    if (
+        synced
+        and subscription.status
+        in (
+            models.StripeSubscription.Status.INCOMPLETE,
+            models.StripeSubscription.Status.PAST_DUE,
+        )
+        and pm_change
+    ):
+        services.stripe_retry_latest_invoice(customer.customer_id)
+
+    return models.StripeEvent.Status.PROCESSED
+
+
+# Handlers by payload_type less its last segment, e.g., customer.subscription.updated is
+# handled by the customer.subscription handler.
+EVENT_HANDLERS = {
+    "customer.subscription": handle_subscription_event,
+}
 
 
 def process_stripe_event(event_id, verify_signature=True, check_created=True):
     """Handler for Stripe Events"""
     logger.info(f"StripeEvent.id={event_id} process_stripe_event task started")
     event = models.StripeEvent.objects.get(pk=event_id)
+    # A task may be delivered more than once. Don't redo the work, and the calls to Stripe,
+    # for an event that has already been handled. Replays are separate StripeEvents.
+    if event.status in (
+        models.StripeEvent.Status.PROCESSED,
+        models.StripeEvent.Status.IGNORED,
+    ):
+        logger.info(f"StripeEvent.id={event_id} already {event.status}. Skipping.")
+        return
     try:
         event.status = models.StripeEvent.Status.PENDING
-        event.save()
+        event.save(update_fields=["status"])
 
         if verify_signature and settings.STRIPE_WH_SECRET:
             services.stripe_check_webhook_signature(event)
 
         payload = json.loads(event.body)
-        data_object = payload["data"]["object"]
-
-        # If the payload_type is customer.subscription.*,
-        # create or update the appropriate StripeSubscription.
-        if event.payload_type.startswith("customer.subscription."):
-            # Extract the relevant attributes from the event payload
-            id = data_object["id"]
-            customer_id = data_object["customer"]
-            current_period_end = data_object["current_period_end"]
-            price_id = data_object["items"]["data"][0]["price"]["id"]
-            cancel_at_period_end = data_object["cancel_at_period_end"]
-            created = data_object["created"]
-            status = data_object["status"]
-
-            # Link Customer/User to Event
-            try:
-                customer = link_user_to_event(event, customer_id)
-            except models.Customer.DoesNotExist:
-                # If a user is being hard deleted so the subscription is immediately canceled,
-                # this will happen, so we need to be ok with a user not existing in that case.
-                if status == "canceled":
-                    logger.warning(
-                        f"StripeEvent.id={event.id} could not locate a user who may have been hard deleted."
-                    )
-                    event.status = models.StripeEvent.Status.PROCESSED
-                    event.save()
-                    return
-                else:
-                    raise
-
-            # Ensure this Event is the latest one, i.e., Events haven't
-            # arrived out of order.
-            if check_created and (
-                models.StripeEvent.objects.filter(
-                    user=customer.user, created__gte=event.created
-                )
-                .exclude(pk=event_id)
-                .exists()
-            ):
-                logger.warning(
-                    f"StripeEvent.id={event.id} processed out of order. Ignoring."
-                )
-                event.status = models.StripeEvent.Status.IGNORED
-                event.save()
-                return
-
-            # Create or update StripeSubscription
-            subscription = models.StripeSubscription.objects.filter(id=id).first()
-            if not subscription:
-                logger.info(
-                    f"StripeEvent.id={event_id} no StripeSubscription found, creating."
-                )
-                subscription = models.StripeSubscription(id=id)
-
-            subscription.current_period_end = dt.fromtimestamp(
-                current_period_end, tz=timezone.utc
-            )
-            subscription.price_id = price_id
-            subscription.cancel_at_period_end = cancel_at_period_end
-            subscription.created = dt.fromtimestamp(created, tz=timezone.utc)
-            subscription.status = status
-            subscription.save()
-
-            # Link Customer/User to StripeSubscription
-            if not subscription.customer:
-                logger.info(
-                    f"StripeEvent.id={event_id} no customer attached to StripeSubscription, attaching to {customer}."
-                )
-                subscription.customer = customer
-                subscription.save()
-            else:
-                # Integrity check: if the StripeSubscription already has a customer, it should match
-                # the incoming subscription update.
-                assert (
-                    subscription.customer == customer
-                ), "Integrity error: StripeSubscription Customer does not match incoming subscription update customer_id"
-
-            # Sync the Customer with the StripeSubscription.
-
-            # If a Customer somehow erroneously has multiple StripeSubscriptions,
-            # prefer the active one, followed by past_due. If there are still multiple,
-            # take the latest created one. That's what this equality check does because
-            # of how customer.subscription the property is defined.
-            logger.debug(
-                f"StripeEvent.id={event_id} comparing subscription.id={subscription} and customer.subscription.id={customer.subscription}"
-            )
-            if subscription == customer.subscription:
-                logger.debug(
-                    f"StripeEvent.id={event.id} syncing the subcription to customer"
-                )
-                subscription.sync_to_customer()
-                subscription.refresh_from_db()
-                customer.refresh_from_db()
-
-                # If payment method has changed and the subscription is paid_due, retry payment.
-                pm_change = (
-                    payload["data"]
-                    .get("previous_attributes", {})
-                    .get("default_payment_method")
-                )
-                if (
-                    subscription.status
-                    in (
-                        models.StripeSubscription.Status.INCOMPLETE,
-                        models.StripeSubscription.Status.PAST_DUE,
-                    )
-                    and pm_change
-                ):
-                    services.stripe_retry_latest_invoice(customer.customer_id)
-
-            event.status = models.StripeEvent.Status.PROCESSED
+        handler = EVENT_HANDLERS.get(event.payload_type.rpartition(".")[0])
+        if handler:
+            event.status = handler(event, payload, check_created)
         else:
             event.status = models.StripeEvent.Status.IGNORED
     except Exception as e:
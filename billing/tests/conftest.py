@@ -3,7 +3,7 @@ import stripe
 from unittest.mock import Mock
 from django.utils import timezone
 
-from .. import factories
+from .. import factories, models
 
 
 @pytest.fixture(autouse=True)
@@ -11,6 +11,13 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_plan_cache():
+    """The Plan and Limit caches outlive each test's database transaction, so start fresh."""
+    models.clear_plan_cache()
+    models.clear_limit_cache()
+
+
 @pytest.fixture(autouse=True)
 def mock_stripe_customer(monkeypatch):
     """Fixture to monkeypatch the stripe.Customer.* methods"""
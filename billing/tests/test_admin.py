@@ -0,0 +1,111 @@
+"""Tests for the billing admin actions."""
+import json
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import admin, models, tasks
+
+
+@pytest.fixture
+def stripe_events():
+    """Return a function that creates processed StripeEvents of a type that is ignored
+    when replayed, and returns their pks."""
+
+    def inner(count):
+        for i in range(count):
+            models.StripeEvent.objects.create(
+                event_id=f"evt_{i}",
+                payload_type="test.event",
+                body=json.dumps({"id": f"evt_{i}", "type": "test.event"}),
+                headers={},
+                created=timezone.now(),
+                status=models.StripeEvent.Status.PROCESSED,
+            )
+        return list(models.StripeEvent.objects.values_list("pk", flat=True))
+
+    return inner
+
+
+def replay(admin_client, pks):
+    url = reverse("admin:billing_stripeevent_changelist")
+    response = admin_client.post(
+        url, {"action": "replay_event", "_selected_action": pks}
+    )
+    assert response.status_code == 302
+    return models.StripeEvent.objects.exclude(pk__in=pks)
+
+
+@pytest.mark.parametrize("can_return_rows", [True, False])
+def test_replay_event(admin_client, stripe_events, monkeypatch, can_return_rows):
+    """Replaying StripeEvents creates a copy of each and processes it, whether or not the
+    database can return the pks of bulk inserted rows."""
+    monkeypatch.delattr(tasks, "shared_task", raising=False)
+    monkeypatch.setattr(
+        type(connection.features), "can_return_rows_from_bulk_insert", can_return_rows
+    )
+    pks = stripe_events(3)
+
+    replays = replay(admin_client, pks)
+    assert replays.count() == 3
+    assert sorted(event.note for event in replays) == sorted(
+        f"Replay of event pk {pk}" for pk in pks
+    )
+    for event in replays:
+        assert event.status == models.StripeEvent.Status.IGNORED
+
+
+@pytest.mark.parametrize("can_return_rows", [True, False])
+def test_replay_event_celery(admin_client, stripe_events, monkeypatch, can_return_rows):
+    """With celery installed, the replayed StripeEvents are processed as a group of tasks."""
+    pytest.importorskip("celery")
+    monkeypatch.setattr(
+        type(connection.features), "can_return_rows_from_bulk_insert", can_return_rows
+    )
+    pks = stripe_events(3)
+
+    replays = replay(admin_client, pks)
+    assert replays.count() == 3
+    for event in replays:
+        assert event.status == models.StripeEvent.Status.IGNORED
+
+
+@pytest.mark.parametrize("can_return_rows", [True, False])
+def test_replay_event_batches(
+    admin_client, stripe_events, monkeypatch, can_return_rows
+):
+    """A replay larger than one batch inserts and processes every batch."""
+    monkeypatch.setattr(admin.StripeEventAdmin, "replay_batch_size", 2)
+    monkeypatch.setattr(
+        type(connection.features), "can_return_rows_from_bulk_insert", can_return_rows
+    )
+    pks = stripe_events(5)
+
+    replays = replay(admin_client, pks)
+    assert replays.count() == 5
+    for event in replays:
+        assert event.status == models.StripeEvent.Status.IGNORED
+
+
+def test_changelist_user_link(admin_client, admin_user, stripe_events):
+    """The StripeEvent changelist links each event to its User."""
+    stripe_events(2)
+    models.StripeEvent.objects.update(user=admin_user)
+    response = admin_client.get(reverse("admin:billing_stripeevent_changelist"))
+    assert response.status_code == 200
+    assert f"/admin/auth/user/{admin_user.pk}/change/" in response.content.decode()
+
+
+def test_changelist_search_event_id(admin_client, stripe_events):
+    """Searching a Stripe event id finds that event by exact match."""
+    stripe_events(12)
+    url = reverse("admin:billing_stripeevent_changelist")
+    response = admin_client.get(url, {"q": "evt_1"})
+    assert response.status_code == 200
+    assert [event.event_id for event in response.context["cl"].result_list] == ["evt_1"]
+
+    # Other terms still search the other fields.
+    response = admin_client.get(url, {"q": "test.event"})
+    assert len(response.context["cl"].result_list) == 12
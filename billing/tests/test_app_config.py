@@ -0,0 +1,16 @@
+"""Tests related to the billing app configuration."""
+
+import pytest
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+
+from .. import settings
+
+
+def test_missing_settings(monkeypatch):
+    """All missing required settings are reported together."""
+    monkeypatch.setattr(settings, "STRIPE_API_KEY", None)
+    monkeypatch.setattr(settings, "CHECKOUT_CANCEL_URL", None)
+    with pytest.raises(ImproperlyConfigured) as e:
+        apps.get_app_config("billing").ready()
+    assert str(e.value) == "STRIPE_API_KEY, CHECKOUT_CANCEL_URL must be configured."
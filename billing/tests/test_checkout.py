@@ -61,6 +61,15 @@ def test_create_checkout_session_unmatched_plan_slug(
     assert response.url == settings.CHECKOUT_CANCEL_URL
 
 
+def test_plan_slug_renamed(paid_plan):
+    """A Plan's slug follows its name, including after the Plan is renamed."""
+    paid_plan.name = "First Name"
+    assert paid_plan.slug == "first-name"
+    paid_plan.name = "Second Name"
+    paid_plan.save()
+    assert paid_plan.slug == "second-name"
+
+
 def test_create_checkout_session_already_paid(
     auth_client, paid_plan, user, mock_stripe_checkout
 ):
@@ -92,8 +101,8 @@ def test_create_subscription_metadata(
     caplog, auth_client, user, session, mock_stripe_customer
 ):
     """Successful checkout session updates metadata on Stripe Customer"""
-    mock_stripe_customer.retrieve.return_value.metadata = {}
-    mock_stripe_customer.retrieve.return_value.email = user.email
+    session.customer.metadata = {}
+    session.customer.email = user.email
     url = reverse("billing:checkout_success")
     query_params = {"session_id": factories.id("sess")}
 
@@ -102,7 +111,7 @@ def test_create_subscription_metadata(
 
     assert 302 == response.status_code
     assert settings.CHECKOUT_SUCCESS_URL == response.url
-    assert mock_stripe_customer.retrieve.call_count == 1
+    assert mock_stripe_customer.retrieve.call_count == 0
     assert mock_stripe_customer.modify.call_count == 1
     assert len(caplog.records) == 0
 
@@ -114,7 +123,7 @@ def test_create_subscription_bad_metadata(
     application, logs, caplog, auth_client, session, mock_stripe_customer
 ):
     """Bad metadata does not update the Stripe Customer and logs an error"""
-    mock_stripe_customer.retrieve.return_value.metadata = {
+    session.customer.metadata = {
         "user_pk": "bad",
         "application": application,
     }
@@ -126,7 +135,7 @@ def test_create_subscription_bad_metadata(
 
     assert 302 == response.status_code
     assert settings.CHECKOUT_SUCCESS_URL == response.url
-    assert mock_stripe_customer.retrieve.call_count == 1
+    assert mock_stripe_customer.retrieve.call_count == 0
     assert mock_stripe_customer.modify.call_count == 0
     assert len(caplog.records) == logs
 
@@ -135,8 +144,8 @@ def test_create_subscription_changed_email(
     caplog, auth_client, user, session, mock_stripe_customer
 ):
     """If a User changes their email during the Checkout process, revert it."""
-    mock_stripe_customer.retrieve.return_value.metadata = {}
-    mock_stripe_customer.retrieve.return_value.email = "new@example.com"
+    session.customer.metadata = {}
+    session.customer.email = "new@example.com"
     url = reverse("billing:checkout_success")
     query_params = {"session_id": factories.id("sess")}
 
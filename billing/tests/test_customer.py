@@ -6,9 +6,13 @@ import pytest
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from .. import models, factories
+from ..management.commands import billing_init
 
 User = get_user_model()
 
@@ -30,6 +34,26 @@ def test_save_user_create_customer():
     assert 1 == models.Plan.objects.filter(type=models.Plan.Type.FREE_DEFAULT).count()
 
 
+def test_save_user_create_customer_cached_plan():
+    """Once the free_default plan exists, creating a Customer for a new User gets it from the cache."""
+    factories.UserFactory()
+    factories.UserFactory()  # Creating the plan cleared the cache, so this fills it.
+    with CaptureQueriesContext(connection) as queries:
+        User.objects.create_user(username="another", email="another@example.com")
+    assert not any("billing_plan" in query["sql"] for query in queries)
+    assert 1 == models.Plan.objects.filter(type=models.Plan.Type.FREE_DEFAULT).count()
+
+
+def test_save_user_create_customer_no_update():
+    """A Customer created for a new User isn't saved a second time."""
+    with CaptureQueriesContext(connection) as queries:
+        user = User.objects.create_user(username="new", email="new@example.com")
+    assert not any(
+        query["sql"].startswith('UPDATE "billing_customer"') for query in queries
+    )
+    assert user.customer.state == "free_default.new"
+
+
 def test_save_user_create_customer_exists():
     """Saving a User that has a Customer does not create a Customer."""
     user = factories.UserFactory()
@@ -39,6 +63,59 @@ def test_save_user_create_customer_exists():
     assert customer_id == customer.id
 
 
+def test_billing_init_create_customers():
+    """The billing_init command creates a free_default Customer for Users without one."""
+    factories.UserFactory()
+    User.objects.bulk_create(
+        [User(username="nocustomer1"), User(username="nocustomer2")]
+    )  # bulk_create does not send the post_save signal.
+    assert 1 == models.Customer.objects.count()
+
+    call_command("billing_init")
+
+    assert 3 == models.Customer.objects.count()
+    assert 0 == User.objects.filter(customer__isnull=True).count()
+    assert 3 == models.Customer.objects.filter(plan__type="free_default").count()
+
+
+def test_billing_init_batches(monkeypatch):
+    """The billing_init command creates the missing Customers one batch at a time."""
+    monkeypatch.setattr(billing_init.Command, "batch_size", 2)
+    User.objects.bulk_create([User(username=f"nocustomer{i}") for i in range(5)])
+
+    with CaptureQueriesContext(connection) as ctx:
+        call_command("billing_init")
+
+    inserts = [
+        q
+        for q in ctx.captured_queries
+        if q["sql"].startswith("INSERT") and "billing_customer" in q["sql"]
+    ]
+    assert 3 == len(inserts)
+
+    assert 5 == models.Customer.objects.count()
+    assert 0 == User.objects.filter(customer__isnull=True).count()
+
+
+def test_create_batch_fast():
+    """UserFactory.create_batch_fast creates Users with free_default Customers."""
+    users = factories.UserFactory.create_batch_fast(5)
+    assert 5 == User.objects.count()
+    assert 5 == models.Customer.objects.filter(user__in=users).count()
+    for user in User.objects.all():
+        assert user.customer.state == "free_default.new"
+
+
+def test_create_batch_fast_no_returned_pks(monkeypatch):
+    """UserFactory.create_batch_fast works on databases that don't return the pks of bulk inserted rows."""
+    monkeypatch.setattr(
+        type(connection.features), "can_return_rows_from_bulk_insert", False
+    )
+    users = factories.UserFactory.create_batch_fast(3)
+    assert all(user.pk for user in users)
+    assert 3 == models.Customer.objects.filter(user__in=users).count()
+
+
 def test_save_user_save_customer():
     """Saving a User with a related Customer saves the Customer as well."""
     user = factories.UserFactory()
@@ -70,6 +147,18 @@ def test_update_user_stripe(field, value, should_call, mock_stripe_customer):
     assert mock_stripe_customer.modify.called is should_call
 
 
+def test_update_user_stripe_update_fields(mock_stripe_customer):
+    """Saving only fields that aren't synced to Stripe, e.g. last_login on login, doesn't call out to Stripe."""
+    user = factories.UserFactory(paying=True)
+    user.email = factories.fake.safe_email()
+    user.last_login = timezone.now()
+    user.save(update_fields=["last_login"])
+    assert mock_stripe_customer.modify.called is False
+
+    user.save(update_fields=["email"])
+    assert mock_stripe_customer.modify.called is True
+
+
 def test_soft_delete_user_active_subscription(mock_stripe_subscription):
     """Soft deleting a User with an active Stripe subscription cancels the Subscription."""
     user = factories.UserFactory(paying=True)
@@ -248,3 +337,75 @@ def test_customer_state(
         )
 
     assert customer.state == customer_state
+
+
+def test_customer_state_invalid(customer):
+    """A combination that isn't in the state table is invalid, e.g. a paid plan with no subscription."""
+    customer.plan = factories.PlanFactory(paid=True)
+    customer.current_period_end = timezone.now() + timedelta(days=30)
+    customer.save()
+    assert customer.state == "invalid"
+
+
+def test_customer_state_cached(customer, django_assert_num_queries):
+    """Customer.state is only computed once per instance, until the Customer is saved."""
+    assert customer.state == "free_default.new"
+    with django_assert_num_queries(0):
+        assert customer.state == "free_default.new"
+
+    customer.plan = factories.PlanFactory(type=models.Plan.Type.FREE_PRIVATE)
+    customer.save()
+    assert customer.state == "free_private.indefinite"
+
+
+def test_customer_state_with_subscriptions(django_assert_num_queries):
+    """Customer.objects.with_subscriptions() computes every Customer's state without a query per Customer."""
+    paid_plan = factories.PlanFactory(paid=True)
+    current_period_end = timezone.now() + timedelta(days=30)
+    for status in ("active", "past_due"):
+        customer = factories.UserFactory().customer
+        customer.plan = paid_plan
+        customer.current_period_end = current_period_end
+        customer.save()
+        factories.StripeSubscriptionFactory(
+            customer=customer,
+            price_id=paid_plan.price_id,
+            current_period_end=current_period_end,
+            status="canceled",
+            created=timezone.now() + timedelta(days=1),
+            dont_sync_to_customer=True,
+        )
+        factories.StripeSubscriptionFactory(
+            customer=customer,
+            price_id=paid_plan.price_id,
+            current_period_end=current_period_end,
+            status=status,
+        )
+
+    with django_assert_num_queries(2):
+        states = [c.state for c in models.Customer.objects.with_subscriptions()]
+    assert sorted(states) == ["paid.past_due.requires_payment_method", "paid.paying"]
+
+
+def test_customer_with_plan_and_user(customer, django_assert_num_queries):
+    """Customers can be loaded along with their Plan and User."""
+    customer = models.Customer.objects.with_plan_and_user().get(pk=customer.pk)
+    with django_assert_num_queries(0):
+        customer.plan.type
+        customer.user.email
+
+
+def test_customer_only_deferred_relations(customer):
+    """The default manager doesn't join the Plan or User, so they can be deferred."""
+    loaded = models.Customer.objects.only("id", "customer_id").get(pk=customer.pk)
+    assert loaded.customer_id == customer.customer_id
+
+
+def test_customer_state_unsaved(django_assert_num_queries):
+    """The state of a Customer that hasn't been saved yet, e.g. when clean() validates it,
+    doesn't look for its subscriptions."""
+    user = User(username="unsaved", email="unsaved@example.com")
+    plan = factories.PlanFactory(paid=True)
+    customer = models.Customer(user=user, plan=plan)
+    with django_assert_num_queries(0):
+        assert customer.state == "invalid"
@@ -1,15 +1,17 @@
 """Stripe lifecycle webhook functionality. Webhooks where the user has taken
 some action in Checkout or Portal are found elsewhere."""
 
+import json
 from datetime import timedelta
 from unittest.mock import Mock
 from freezegun import freeze_time
 
 import pytest
+import stripe
 from django.utils import timezone
 from django.urls import reverse
 
-from .. import models, factories
+from .. import models, factories, settings, tasks
 
 
 @pytest.fixture
@@ -121,6 +123,7 @@ def test_subscription_event_new_stripe_subscription(
     assert 1 == models.StripeEvent.objects.count()
     event = models.StripeEvent.objects.first()
     assert models.StripeEvent.Status.PROCESSED == event.status
+    assert event.subscription_status == event_json["status"]
 
     assert 1 == models.StripeSubscription.objects.count()
     subscription = models.StripeSubscription.objects.first()
@@ -157,6 +160,7 @@ def test_subscription_event_update_stripe_subscription(client, subscription_even
     assert 1 == models.StripeEvent.objects.count()
     event = models.StripeEvent.objects.first()
     assert models.StripeEvent.Status.PROCESSED == event.status
+    assert event.subscription_status == event_json["status"]
 
     assert 1 == models.StripeSubscription.objects.count()
     subscription = models.StripeSubscription.objects.first()
@@ -282,6 +286,32 @@ def test_payment_update_and_retry(
     assert mock_stripe_invoice.pay.call_count == 1
 
 
+def test_payment_update_retry_declined(
+    client, subscription_event, customer, mock_stripe_invoice
+):
+    """If retrying the last open invoice fails, the subscription update is still saved."""
+    mock_stripe_invoice.list.return_value = {
+        "data": [{"status": "open", "id": "inv_123"}]
+    }
+    mock_stripe_invoice.pay.side_effect = stripe.error.CardError(
+        "Your card was declined.", None, "card_declined"
+    )
+    url = reverse("billing:stripe_webhook")
+
+    payload = subscription_event(status="past_due")["payload"]
+    payload["data"]["previous_attributes"] = {"default_payment_method": "pm_new"}
+
+    response = client.post(url, payload, content_type="application/json")
+    assert response.status_code == 201
+    event = models.StripeEvent.objects.first()
+    assert event.status == models.StripeEvent.Status.ERROR
+    assert "CardError" in event.note
+    assert event.user.customer == customer
+    assert customer.stripesubscription_set.get().status == "past_due"
+    customer.refresh_from_db()
+    assert customer.state == "paid.past_due.requires_payment_method"
+
+
 def test_incomplete_expired_cycle(client, user, subscription_event):
     """A StripeSubscription that transitions from incomplete to incomplete_expired should not error."""
     # This is a bugfix that results from ignoring deleted subscriptions when the customer is not on a
@@ -349,3 +379,49 @@ def test_misordered_event(client, user, mock_stripe_customer, subscription_event
     customer.refresh_from_db()
     assert customer.customer_id == "cus_new"
     assert customer.state == "paid.paying"
+
+
+@pytest.mark.parametrize("valid,status", [(True, "ignored"), (False, "error")])
+def test_webhook_signature(client, monkeypatch, valid, status):
+    """If a webhook secret is set, the Stripe signature is verified against the raw body."""
+    secret = "whsec_test"
+    monkeypatch.setattr(settings, "STRIPE_WH_SECRET", secret)
+    url = reverse("billing:stripe_webhook")
+    payload = json.dumps(
+        {
+            "id": "evt_test",
+            "object": "event",
+            "type": "bad.type",
+            "created": int(timezone.now().timestamp()),
+            "data": {"object": None},
+        }
+    )
+    timestamp = int(timezone.now().timestamp())
+    signature = stripe.WebhookSignature._compute_signature(
+        f"{timestamp}.{payload}", secret if valid else "whsec_wrong"
+    )
+    response = client.post(
+        url,
+        payload,
+        content_type="application/json",
+        HTTP_STRIPE_SIGNATURE=f"t={timestamp},v1={signature}",
+    )
+    assert 201 == response.status_code
+    assert status == models.StripeEvent.objects.first().status
+
+
+def test_event_already_processed(client, subscription_event, monkeypatch):
+    """Processing a StripeEvent that has already been processed does nothing."""
+    url = reverse("billing:stripe_webhook")
+    payload = subscription_event()["payload"]
+    response = client.post(url, payload, content_type="application/json")
+    assert response.status_code == 201
+    event = models.StripeEvent.objects.first()
+    assert event.status == models.StripeEvent.Status.PROCESSED
+
+    link_user_to_event = Mock()
+    monkeypatch.setattr(tasks, "link_user_to_event", link_user_to_event)
+    tasks.process_stripe_event(event.id)
+    assert link_user_to_event.called is False
+    event.refresh_from_db()
+    assert event.status == models.StripeEvent.Status.PROCESSED
@@ -1,6 +1,8 @@
 import pytest
 from pytest_django.asserts import assertTemplateUsed
 from django.urls import reverse
+from django.core.cache import cache
+from .. import models
 from ..models import Customer
 
 
@@ -25,3 +27,29 @@ def test_billing_mixin(auth_client, monkeypatch, state, paid_plan):
     url = reverse("profile")
     response = auth_client.get(url)
     assertTemplateUsed(response, "profile.html")
+
+
+def test_billing_mixin_plan_renamed(auth_client, paid_plan):
+    """BillingMixin should not use a stale checkout URL after the paid Plan changes"""
+    url = reverse("profile")
+    auth_client.get(url)
+    paid_plan.name = "Renamed Plan"
+    paid_plan.save()
+    response = auth_client.get(url)
+    assert response.context["stripe_session_url"] == reverse(
+        "billing:create_checkout_session",
+        kwargs={"slug": "renamed-plan", "pk": paid_plan.pk},
+    )
+
+
+def test_plan_cache_cleared_on_commit(paid_plan, django_capture_on_commit_callbacks):
+    """The Plan cache is cleared again when a Plan change is committed, so Plans cached
+    by another process before the commit aren't kept."""
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        paid_plan.name = "Renamed"
+        paid_plan.save()
+        # Another process caches the Plans as they were before the commit.
+        cache.set(models.PLAN_CACHE_KEY, [])
+    assert len(callbacks) == 1
+    assert cache.get(models.PLAN_CACHE_KEY) is None
+    assert "Renamed" in [plan.name for plan in models.cached_plans()]
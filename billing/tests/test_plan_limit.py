@@ -5,6 +5,7 @@
 import pytest
 from datetime import timedelta
 from django.utils import timezone
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from .. import factories, models
 
@@ -129,3 +130,86 @@ def test_get_limit_free_private_plan_with_no_date(paid_plan):
 
     value = user.customer.get_limit("Limit 1")
     assert value == 0
+
+
+@pytest.mark.django_db
+def test_get_limit_expired_plan_cached(customer, django_assert_num_queries):
+    """The free_default plan used by an expired plan's limits, and its limits, come from the cache."""
+    customer.current_period_end = timezone.now() - timedelta(minutes=1)
+    customer.save()
+    free_default_plan = models.Plan.objects.get(type=models.Plan.Type.FREE_DEFAULT)
+    factories.PlanLimitFactory(plan=free_default_plan, value=50, limit__name="Limit 1")
+    assert customer.get_limit("Limit 1") == 50  # Warms the Plan cache
+
+    with django_assert_num_queries(0):
+        assert customer.get_limit("Limit 1") == 50
+
+
+@pytest.mark.django_db
+def test_get_limit_prefetched(customer, django_assert_num_queries):
+    """A Customer loaded with_limits() resolves its own Plan's limits without querying."""
+    customer = models.Customer.objects.with_limits().get(pk=customer.pk)
+    with django_assert_num_queries(0):
+        assert customer.get_limit("Limit 1") == 1
+        assert customer.get_limit("Limit 2") == 2
+
+    # Limits not set on the Plan still fall back to the Limit default.
+    assert customer.get_limit("Limit 3") == 97
+
+
+@pytest.mark.django_db
+def test_get_limits(customer, django_assert_num_queries):
+    """Customer.get_limits returns several limits at once, falling back to the Limit defaults."""
+    with django_assert_num_queries(2):
+        limits = customer.get_limits(["Limit 1", "Limit 2", "Limit 3"])
+    assert limits == {"Limit 1": 1, "Limit 2": 2, "Limit 3": 97}
+
+    with pytest.raises(ObjectDoesNotExist):
+        customer.get_limits(["Limit 1", "Bad Limit"])
+
+
+@pytest.mark.django_db
+def test_get_limits_reads_cache_once(customer, monkeypatch):
+    """Customer.get_limits reads the Limit cache once, however many limits fall back to
+    their defaults."""
+    cached_limits = models.cached_limits
+    calls = []
+    monkeypatch.setattr(
+        models, "cached_limits", lambda: calls.append(1) or cached_limits()
+    )
+    customer.get_limits(["Limit 1", "Limit 2", "Limit 3"])
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_get_limit_cache_cleared(customer):
+    """Changing a PlanLimit or a Limit default in the admin is reflected immediately."""
+    assert customer.get_limit("Limit 1") == 1
+    assert customer.get_limit("Limit 3") == 97
+
+    plan_limit = models.PlanLimit.objects.get(plan=customer.plan, limit__name="Limit 1")
+    plan_limit.value = 10
+    plan_limit.save()
+    models.Limit.objects.filter(name="Limit 3").first().delete()
+    factories.LimitFactory(name="Limit 3", default=50)
+
+    assert customer.get_limit("Limit 1") == 10
+    assert customer.get_limit("Limit 3") == 50
+
+
+@pytest.mark.django_db
+def test_get_limit_cache_cleared_on_commit(
+    customer, django_capture_on_commit_callbacks
+):
+    """The Limit cache is cleared again when a change is committed, so limits cached by
+    another process before the commit aren't kept."""
+    with django_capture_on_commit_callbacks(execute=True):
+        plan_limit = models.PlanLimit.objects.get(
+            plan=customer.plan, limit__name="Limit 1"
+        )
+        plan_limit.value = 10
+        plan_limit.save()
+        # Another process caches the limits as they were before the commit.
+        cache.set(models.LIMIT_CACHE_KEY, {"defaults": {}, "plans": {}})
+    assert cache.get(models.LIMIT_CACHE_KEY) is None
+    assert customer.get_limit("Limit 1") == 10
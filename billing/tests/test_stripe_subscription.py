@@ -70,3 +70,116 @@ def test_sync_canceled(customer, paid_plan, status):
     else:
         assert customer.plan == paid_plan
         assert customer.current_period_end == subscription.current_period_end
+
+
+def test_create_batch_dont_sync(customer, paid_plan):
+    """Subscriptions built in bulk can skip syncing to the Customer."""
+    factories.StripeSubscriptionFactory.create_batch(
+        3, customer=customer, price_id=paid_plan.price_id, dont_sync_to_customer=True
+    )
+    customer.refresh_from_db()
+    assert customer.stripesubscription_set.count() == 3
+    assert customer.plan.type == models.Plan.Type.FREE_DEFAULT
+
+
+def test_sync_active_plan_not_in_cache(customer, paid_plan):
+    """A Plan missing from a stale Plan cache is still found by its price_id."""
+    plan = factories.PlanFactory(
+        type=models.Plan.Type.PAID_PRIVATE, price_id="price_new"
+    )
+    # Leave the new Plan out of the cache, as if it was filled before the Plan was created.
+    models.cache.set(
+        models.PLAN_CACHE_KEY,
+        [p for p in models.cached_plans() if p.id != plan.id],
+    )
+
+    subscription = factories.StripeSubscriptionFactory(
+        customer=customer,
+        price_id="price_new",
+        current_period_end=timezone.now() + timedelta(days=30),
+        dont_sync_to_customer=True,
+    )
+    subscription.sync_to_customer()
+
+    customer.refresh_from_db()
+    assert customer.plan == plan
+
+
+def test_bulk_sync_to_customer(paid_plan, django_assert_num_queries):
+    """bulk_sync_to_customer syncs many subscriptions to their Customers with one update."""
+    current_period_end = timezone.now() + timedelta(days=30)
+    customers = [factories.UserFactory().customer for _ in range(3)]
+    for customer, status in zip(customers, ["active", "active", "canceled"]):
+        factories.StripeSubscriptionFactory(
+            customer=customer,
+            status=status,
+            price_id=paid_plan.price_id,
+            current_period_end=current_period_end,
+            dont_sync_to_customer=True,
+        )
+    models.cached_plans()  # Warms the Plan cache
+
+    subscriptions = list(
+        models.StripeSubscription.objects.select_related("customer").order_by(
+            "customer"
+        )
+    )
+    with django_assert_num_queries(2):
+        # The free_default Customer's canceled subscription is ignored, like in the webhook.
+        assert models.StripeSubscription.bulk_sync_to_customer(subscriptions) == 2
+
+    for customer in customers:
+        customer.refresh_from_db()
+    assert customers[0].plan == paid_plan
+    assert customers[0].current_period_end == current_period_end
+    assert customers[1].plan == paid_plan
+    assert customers[2].plan.type == models.Plan.Type.FREE_DEFAULT
+    assert customers[2].current_period_end is None
+
+
+@pytest.mark.parametrize("order", ["created", "-created"])
+def test_bulk_sync_to_customer_preferred(paid_plan, order):
+    """bulk_sync_to_customer only syncs each Customer's preferred subscription, so an old
+    canceled subscription doesn't downgrade a paying Customer, whatever the order."""
+    current_period_end = timezone.now() + timedelta(days=30)
+    customer = factories.UserFactory(paying=True).customer
+    customer.current_period_end = current_period_end
+    customer.save()
+    factories.StripeSubscriptionFactory(
+        customer=customer,
+        status="canceled",
+        price_id=paid_plan.price_id,
+        created=timezone.now() - timedelta(days=60),
+        dont_sync_to_customer=True,
+    )
+    other = factories.UserFactory().customer
+    factories.StripeSubscriptionFactory(
+        customer=other,
+        status="active",
+        price_id=paid_plan.price_id,
+        current_period_end=current_period_end,
+        created=timezone.now() - timedelta(days=60),
+        dont_sync_to_customer=True,
+    )
+    factories.StripeSubscriptionFactory(
+        customer=other,
+        status="canceled",
+        price_id=paid_plan.price_id,
+        dont_sync_to_customer=True,
+    )
+    assert customer.state == "paid.paying"  # Gut check
+
+    subscriptions = list(
+        models.StripeSubscription.objects.select_related("customer").order_by(order)
+    )
+    models.StripeSubscription.bulk_sync_to_customer(subscriptions)
+
+    for c in (customer, other):
+        c.refresh_from_db()
+        assert c.plan.type == models.Plan.Type.PAID_PUBLIC
+        assert c.current_period_end is not None
+        assert c.state == "paid.paying"
+
+    # Only passing the canceled subscription doesn't downgrade the Customer either.
+    canceled = customer.stripesubscription_set.filter(status="canceled")
+    assert models.StripeSubscription.bulk_sync_to_customer(list(canceled)) == 0
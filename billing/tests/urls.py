@@ -1,8 +1,10 @@
+from django.contrib import admin
 from django.urls import path, include
 
 from . import views
 
 urlpatterns = [
+    path("admin/", admin.site.urls),
     path("billing/", include("billing.urls")),
     path("profile/", views.ProfileView.as_view(), name="profile"),
 ]
@@ -15,11 +15,24 @@ from django.http import JsonResponse
 
 import stripe
 
-from . import models, settings, services, tasks
+from . import mixins, models, settings, services, tasks
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Customer states that may start a Stripe Checkout or use the Stripe Customer Portal. These are
+# the states BillingMixin offers each session to, so the views and the buttons can't disagree.
+CHECKOUT_STATES = frozenset(
+    state
+    for state, (session_type, _) in mixins.STATE_SESSIONS.items()
+    if session_type == "checkout"
+)
+PORTAL_STATES = frozenset(
+    state
+    for state, (session_type, _) in mixins.STATE_SESSIONS.items()
+    if session_type == "portal"
+)
+
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -43,12 +56,18 @@ def stripe_webhook_view(request):
         if isinstance(value, str):
             headers[key] = value
 
+    subscription_status = ""
+    if payload["type"].startswith("customer.subscription."):
+        data_object = (payload.get("data") or {}).get("object") or {}
+        subscription_status = data_object.get("status") or ""
+
     event = models.StripeEvent.objects.create(
         event_id=payload["id"],
         payload_type=payload["type"],
         created=dt.fromtimestamp(payload["created"], tz=timezone.utc),
         body=request.body.decode("utf-8"),
         headers=headers,
+        subscription_status=subscription_status,
         status=models.StripeEvent.Status.NEW,
     )
     logger.info(
@@ -67,7 +86,7 @@ class CreateCheckoutSessionView(LoginRequiredMixin, View):
         # Redirect to cancel url if no price id or if price id not in Plan
         plan = models.Plan.objects.filter(
             id=pk,
-            type__in=[models.Plan.Type.PAID_PUBLIC, models.Plan.Type.PAID_PRIVATE],
+            type__in=models.PAID_PLAN_TYPES,
         ).first()
         if not plan:
             logger.error(f"In CreateCheckoutSessionView, invalid plan id={pk}")
@@ -85,10 +104,7 @@ class CreateCheckoutSessionView(LoginRequiredMixin, View):
         # User must not have an active billing plan
         # If a user is trying to switch between paid plans, this is the wrong endpoint.
         customer = request.user.customer
-        if customer.state not in (
-            "free_default.new",
-            "free_private.expired",
-        ):
+        if customer.state not in CHECKOUT_STATES:
             logger.error(
                 f"User.id={request.user.id} attempted to create a checkout session while having an active billing plan."
             )
@@ -160,7 +176,10 @@ class CheckoutSuccessView(LoginRequiredMixin, View):
 
         # If users change their email on the checkout page, this will change it back
         # on the Stripe Customer.
-        services.stripe_customer_sync_metadata_email(request.user, session.customer.id)
+        # The session was retrieved with the customer expanded, so there's no need to retrieve it again.
+        services.stripe_customer_sync_metadata_email(
+            request.user, session.customer.id, stripe_customer=session.customer
+        )
         messages.success(request, "Successfully subscribed!")
 
         return redirect(settings.CHECKOUT_SUCCESS_URL)
@@ -176,13 +195,7 @@ class CreatePortalView(LoginRequiredMixin, View):
 
         # User should be able to access the Portal.
         customer = request.user.customer
-        if customer.state not in (
-            "free_default.past_due.requires_payment_method",
-            "free_default.incomplete.requires_payment_method",
-            "paid.past_due.requires_payment_method",
-            "paid.paying",
-            "paid.will_cancel",
-        ):
+        if customer.state not in PORTAL_STATES:
             logger.error(
                 f"User.id={request.user.id} attempted to create a portal session with an inappropriate state."
             )